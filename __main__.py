@@ -91,4 +91,15 @@ pulumi.export('vpc_id', main_stack.network.vpc.id)
 pulumi.export('private_subnet_ids', main_stack.network.private_subnet_ids)
 pulumi.export('public_subnet_ids', main_stack.network.public_subnet_ids)
 pulumi.export('ecs_cluster_name', main_stack.compute.cluster.name)
-pulumi.export('rds_endpoint', main_stack.data.db_instance.endpoint)
+pulumi.export('rds_endpoint', main_stack.data.writer_endpoint)
+pulumi.export('rds_reader_endpoints', main_stack.data.reader_endpoints)
+if main_stack.data.redis:
+    pulumi.export('redis_primary_endpoint', main_stack.data.redis_primary_endpoint)
+    pulumi.export('redis_reader_endpoint', main_stack.data.redis.reader_endpoint_address)
+if main_stack.data.db_proxy:
+    pulumi.export('rds_proxy_endpoint', main_stack.data.db_proxy.endpoint)
+pulumi.export('logstash_nlb_dns_name', main_stack.compute.nlb.dns_name)
+if main_stack.monitoring.ingest_buffer["enabled"]:
+    pulumi.export('log_ingest_stream_name', main_stack.monitoring.ingest_stream.name)
+if main_stack.monitoring.snapshots["enabled"]:
+    pulumi.export('es_snapshot_bucket', main_stack.monitoring.snapshot_bucket.bucket)
@@ -0,0 +1,58 @@
+import ipaddress
+import math
+from typing import Dict, List
+
+# AWS reserves the first four and the last address of every subnet.
+AWS_RESERVED_ADDRESSES = 5
+MIN_SUBNET_PREFIX = 16
+MAX_SUBNET_PREFIX = 28
+
+
+def prefix_for_hosts(hosts: int) -> int:
+    """Smallest subnet prefix that fits `hosts` usable addresses in AWS."""
+    if hosts < 1:
+        raise ValueError(f"Host count must be positive, got {hosts}")
+    bits = math.ceil(math.log2(hosts + AWS_RESERVED_ADDRESSES))
+    prefix = 32 - bits
+    if prefix < MIN_SUBNET_PREFIX:
+        raise ValueError(f"{hosts} hosts do not fit in a single /{MIN_SUBNET_PREFIX} subnet")
+    return min(prefix, MAX_SUBNET_PREFIX)
+
+
+def plan_subnets(vpc_cidr: str, tier_hosts: Dict[str, int], az_count: int, max_azs: int = 4) -> Dict[str, List[str]]:
+    """Carve non-overlapping per-AZ subnets for each tier out of `vpc_cidr`.
+
+    Every tier gets a block with room for `max_azs` subnets, and AZ `i` always
+    takes slot `i` of its tier's block, so raising `az_count` up to `max_azs`
+    only adds subnets and never moves existing ones. Tiers are laid out
+    largest first (ties keep the given order) so every block stays aligned.
+
+    Changing `max_azs` resizes every block and so moves every tier (with
+    the default tiers in 10.0.0.0/16, public moves from 10.0.64.0/24 to
+    10.0.128.0/24 going from 4 to 5); pick it once, before the first deploy.
+    """
+    if az_count < 1 or az_count > max_azs:
+        raise ValueError(f"az_count must be between 1 and {max_azs}, got {az_count}")
+
+    vpc = ipaddress.ip_network(vpc_cidr)
+    az_bits = math.ceil(math.log2(max_azs))
+
+    prefixes = {tier: prefix_for_hosts(hosts) for tier, hosts in tier_hosts.items()}
+    ordered = sorted(tier_hosts, key=lambda tier: prefixes[tier])
+
+    plan = {}
+    cursor = int(vpc.network_address)
+    vpc_end = int(vpc.broadcast_address)
+    for tier in ordered:
+        block_prefix = prefixes[tier] - az_bits
+        if block_prefix < vpc.prefixlen:
+            raise ValueError(f"Tier '{tier}' needs a /{block_prefix} block, larger than VPC {vpc_cidr}")
+        block = ipaddress.ip_network((cursor, block_prefix))
+        if int(block.broadcast_address) > vpc_end:
+            raise ValueError(f"VPC {vpc_cidr} is too small for the requested tiers")
+
+        subnets = list(block.subnets(new_prefix=prefixes[tier]))
+        plan[tier] = [str(subnet) for subnet in subnets[:az_count]]
+        cursor = int(block.broadcast_address) + 1
+
+    return {tier: plan[tier] for tier in tier_hosts}
@@ -2,6 +2,65 @@ import pulumi
 import pulumi_aws as aws
 from typing import Dict
 
+# Target-group settings shared by every service unless a profile overrides them
+DEFAULT_TARGET_GROUP_PROFILE = {
+    "health_path": "/health",
+    "matcher": "200",
+    "health_check_interval": 30,
+    "health_check_timeout": 5,
+    "healthy_threshold": 2,
+    "unhealthy_threshold": 2,
+    "deregistration_delay": 300,
+    "slow_start": 0,
+    "load_balancing_algorithm_type": "round_robin",
+    "stickiness": None,
+}
+
+# Per-service profiles tuned to each ELK component's warm-up and connection behaviour.
+# ALB cannot combine slow start with least_outstanding_requests, so profiles that
+# warm new targets up gradually stay on round_robin.
+TARGET_GROUP_PROFILES = {
+    "elasticsearch": {
+        "health_path": "/_cluster/health",
+        "health_check_interval": 15,
+        "deregistration_delay": 60,
+        "slow_start": 120,
+        "load_balancing_algorithm_type": "round_robin",
+    },
+    "kibana": {
+        "health_path": "/api/status",
+        "health_check_interval": 15,
+        "deregistration_delay": 30,
+        "slow_start": 60,
+        "load_balancing_algorithm_type": "round_robin",
+        "stickiness": {"type": "lb_cookie", "cookie_duration": 3600},
+    },
+    "logstash": {
+        "health_check_interval": 10,
+        "deregistration_delay": 120,
+    },
+}
+
+# Default capacity-provider strategy for the cluster and per-service overrides.
+# Logstash and Kibana burst onto Spot; Elasticsearch holds data and stays on-demand.
+DEFAULT_CAPACITY_STRATEGY = [
+    {"capacity_provider": "FARGATE", "base": 1, "weight": 1},
+]
+
+SERVICE_CAPACITY_STRATEGIES = {
+    "elasticsearch": [
+        {"capacity_provider": "FARGATE", "base": 1, "weight": 1},
+    ],
+    "logstash": [
+        {"capacity_provider": "FARGATE", "base": 1, "weight": 1},
+        {"capacity_provider": "FARGATE_SPOT", "base": 0, "weight": 3},
+    ],
+    "kibana": [
+        {"capacity_provider": "FARGATE", "base": 1, "weight": 1},
+        {"capacity_provider": "FARGATE_SPOT", "base": 0, "weight": 1},
+    ],
+}
+
 class ComputeStack:
     def __init__(self, network, security, data, project_name: str, environment: str, common_tags: Dict[str, str]):
         self.project_name = project_name
@@ -10,20 +69,45 @@ class ComputeStack:
         self.security = security
         self.data = data
         self.common_tags = common_tags
+
+        # Compute configuration
+        config = pulumi.Config("compute")
+        self.logstash_certificate_arn = config.get("logstash_certificate_arn")
+        self.target_group_config = config.get_object("target_groups") or {}
+        self.discovery_namespace_name = config.get("discovery_namespace") or f"{project_name}.local"
+        self.alb_idle_timeout = config.get_int("alb_idle_timeout") or 60
+        self.alb_ssl_policy = config.get("alb_ssl_policy") or "ELBSecurityPolicy-TLS13-1-2-2021-06"
+        self.default_capacity_strategy = config.get_object("capacity_provider_strategy") or DEFAULT_CAPACITY_STRATEGY
+        self.service_capacity_strategies = {
+            **SERVICE_CAPACITY_STRATEGIES,
+            **(config.get_object("service_capacity_strategies") or {}),
+        }
         
         # Create ECS cluster
         self.cluster = self.create_ecs_cluster()
+        self.cluster_capacity_providers = self.create_cluster_capacity_providers()
+
+        # Create Cloud Map namespace and a discovery service per ELK service
+        self.discovery_namespace = self.create_discovery_namespace()
+        self.discovery_services = {
+            name: self.create_discovery_service(name)
+            for name in ["elasticsearch", "elasticsearch-master", "logstash", "kibana"]
+        }
         
         # Create ALB
         self.alb = self.create_application_load_balancer()
         self.elasticsearch_tg = self.create_target_group("elasticsearch", 9200)
-        self.logstash_tg = self.create_target_group("logstash", 5044)
         self.kibana_tg = self.create_target_group("kibana", 5601) 
         self.listener = self.create_listener()      
+        self.http_listener = self.create_http_redirect_listener() if self.security.ssl_certificate else None
         self.elasticsearch_listener_rule = self.create_listener_rule(self.elasticsearch_tg, "elasticsearch",10)
-        self.logstash_listener_rule = self.create_listener_rule(self.logstash_tg, "logstash",20)
         self.Kibana_listener_rule = self.create_listener_rule(self.kibana_tg,"kibana",30)
 
+        # Create internal NLB for Logstash Beats ingestion (persistent TCP)
+        self.nlb = self.create_network_load_balancer()
+        self.logstash_tg = self.create_target_group("logstash", 5044, protocol="TCP")
+        self.logstash_listener = self.create_logstash_listener()
+
        
 
     def create_ecs_cluster(self):
@@ -40,6 +124,52 @@ class ComputeStack:
         except Exception as e:
             raise Exception(f"Failed to create ECS-cluter: {str(e)}")
 
+    def create_cluster_capacity_providers(self):
+        try:
+            return aws.ecs.ClusterCapacityProviders(
+                f"{self.project_name}-ecs-capacity-providers",
+                cluster_name=self.cluster.name,
+                capacity_providers=["FARGATE", "FARGATE_SPOT"],
+                default_capacity_provider_strategies=self.default_capacity_strategy,
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create ECS-capacity-providers: {str(e)}")
+
+    def capacity_strategy(self, name):
+        return self.service_capacity_strategies.get(name, self.default_capacity_strategy)
+
+    def create_discovery_namespace(self):
+        try:
+            return aws.servicediscovery.PrivateDnsNamespace(
+                f"{self.project_name}-discovery-namespace",
+                name=self.discovery_namespace_name,
+                vpc=self.network.vpc.id,
+                description=f"Service discovery for {self.project_name} ECS services",
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create discovery-namespace: {str(e)}")
+
+    def create_discovery_service(self, name):
+        try:
+            # MULTIVALUE A records return every healthy task IP, so clients get a host list
+            return aws.servicediscovery.Service(
+                f"{self.project_name}-{name}-discovery",
+                name=name,
+                dns_config={
+                    "namespace_id": self.discovery_namespace.id,
+                    "dns_records": [{"type": "A", "ttl": 10}],
+                    "routing_policy": "MULTIVALUE",
+                },
+                health_check_custom_config={"failure_threshold": 1},
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create discovery-service: {str(e)}")
+
+    def service_endpoint(self, name, port, scheme="http"):
+        return f"{scheme}://{name}.{self.discovery_namespace_name}:{port}"
+
     def create_application_load_balancer(self):
         try:
             alb = aws.lb.LoadBalancer(
@@ -48,6 +178,8 @@ class ComputeStack:
                 load_balancer_type="application",
                 security_groups=[self.security.alb_security_group.id],
                 subnets=self.network.public_subnet_ids,
+                enable_http2=True,
+                idle_timeout=self.alb_idle_timeout,
                 enable_deletion_protection=False, #Change to true in prod
                 tags=self.common_tags,
 
@@ -57,44 +189,88 @@ class ComputeStack:
             raise Exception(f"Failed to create ALB: {str(e)}")
         
 
-    def create_target_group(self, name, port, protocol="HTTP", health_path="/health"):
+    def create_network_load_balancer(self):
+        try:
+            return aws.lb.LoadBalancer(
+                f"{self.project_name}-net-lb",
+                internal=True,
+                load_balancer_type="network",
+                subnets=self.network.private_subnet_ids,
+                enable_cross_zone_load_balancing=True,
+                enable_deletion_protection=False, #Change to true in prod
+                tags=self.common_tags,
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create NLB: {str(e)}")
+
+    def target_group_profile(self, name):
+        # Built-in profile for the service, overridden key-by-key from compute:target_groups
+        overrides = self.target_group_config.get(name, {})
+        profile = {**DEFAULT_TARGET_GROUP_PROFILE, **TARGET_GROUP_PROFILES.get(name, {}), **overrides}
+        if profile["slow_start"] and profile["load_balancing_algorithm_type"] == "least_outstanding_requests":
+            raise Exception(
+                f"Target group '{name}' sets slow_start with least_outstanding_requests, "
+                "which ALB does not support; set slow_start to 0 or use round_robin"
+            )
+        return profile
+
+    def create_target_group(self, name, port, protocol="HTTP"):
         try:
+            profile = self.target_group_profile(name)
+            health_check = {
+                "enabled": True,
+                "healthy_threshold": profile["healthy_threshold"],
+                "interval": profile["health_check_interval"],
+                "port": "traffic-port",
+                "protocol": protocol,
+                "timeout": profile["health_check_timeout"],
+                "unhealthy_threshold": profile["unhealthy_threshold"],
+            }
+            tuning = {"deregistration_delay": profile["deregistration_delay"]}
+
+            if protocol in ("HTTP", "HTTPS"):
+                health_check.update({"path": profile["health_path"], "matcher": profile["matcher"]})
+                # Slow start and the routing algorithm are ALB-only settings
+                tuning["slow_start"] = profile["slow_start"]
+                tuning["load_balancing_algorithm_type"] = profile["load_balancing_algorithm_type"]
+            else:
+                # TCP health checks only verify the port accepts connections
+                health_check.pop("timeout")
+
+            stickiness = profile.get("stickiness")
+            if stickiness:
+                tuning["stickiness"] = {"enabled": True, **stickiness}
+
             return aws.lb.TargetGroup(
                 f"{name}-tg",
                 port=port,
                 protocol=protocol,
                 vpc_id=self.network.vpc.id,
                 target_type="ip", 
-                health_check={
-                    "enabled": True,
-                    "healthy_threshold": 2,
-                    "interval": 30,
-                    "path": health_path,
-                    "port": "traffic-port",
-                    "protocol": protocol,
-                    "timeout": 5,
-                    "unhealthy_threshold": 2,
-                    "matcher": "200"
-                },
+                health_check=health_check,
+                **tuning,
                 tags=self.common_tags
             )
         except Exception as e:
             raise Exception(f"Failed to create TargetGroup: {str(e)}")
         
 
-
-
-
-
     def create_listener(self):
         try:
+            # Serve HTTPS (HTTP/2 negotiated via ALPN) when a certificate is enabled, plain HTTP otherwise
+            tls_settings = {"port": 80, "protocol": "HTTP"}
+            if self.security.ssl_certificate:
+                tls_settings = {
+                    "port": 443,
+                    "protocol": "HTTPS",
+                    "ssl_policy": self.alb_ssl_policy,
+                    "certificate_arn": self.security.ssl_certificate.certificate_arn,
+                }
+
             return aws.lb.Listener(
                 f"{self.project_name}-app-listener",
                 load_balancer_arn=self.alb.arn,
-                port=80,
-                protocol="HTTP",
-                # ssl_policy="ELBSecurityPolicy-2016-08",
-                # certificate_arn=self.security.ssl_certificate.arn,
+                **tls_settings,
                 tags=self.common_tags,
                 default_actions=[
                     {
@@ -112,6 +288,54 @@ class ComputeStack:
         except Exception as e:
             raise Exception(f"Failed to create ALB-listener: {str(e)}")
 
+    def create_http_redirect_listener(self):
+        try:
+            return aws.lb.Listener(
+                f"{self.project_name}-app-http-listener",
+                load_balancer_arn=self.alb.arn,
+                port=80,
+                protocol="HTTP",
+                tags=self.common_tags,
+                default_actions=[{
+                    "type": "redirect",
+                    "redirect": {
+                        "port": "443",
+                        "protocol": "HTTPS",
+                        "status_code": "HTTP_301",
+                    },
+                }],
+                # Enabling SSL moves the app listener off port 80 in place; wait for
+                # that update so the two listeners never both claim the port
+                opts=pulumi.ResourceOptions(depends_on=[self.listener])
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create ALB-redirect-listener: {str(e)}")
+
+
+    def create_logstash_listener(self):
+        try:
+            # Terminate TLS on the NLB when a certificate is configured, otherwise pass TCP through
+            tls_settings = {}
+            if self.logstash_certificate_arn:
+                tls_settings = {
+                    "ssl_policy": "ELBSecurityPolicy-TLS13-1-2-2021-06",
+                    "certificate_arn": self.logstash_certificate_arn,
+                }
+
+            return aws.lb.Listener(
+                f"{self.project_name}-logstash-listener",
+                load_balancer_arn=self.nlb.arn,
+                port=5044,
+                protocol="TLS" if self.logstash_certificate_arn else "TCP",
+                **tls_settings,
+                default_actions=[{
+                    "type": "forward",
+                    "target_group_arn": self.logstash_tg.arn,
+                }],
+                tags=self.common_tags,
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create NLB-listener: {str(e)}")
 
     def create_listener_rule(self, target_group, name=str, priority=int):
         try:
@@ -2,6 +2,35 @@ import json
 import pulumi
 import pulumi_aws as aws
 from typing import Dict
+from infrastructure import db_tuning
+
+# RDS Proxy pooling defaults (timeouts in seconds)
+DEFAULT_RDS_PROXY = {
+    "enabled": False,
+    "require_tls": True,
+    "idle_client_timeout": 1800,
+    "connection_borrow_timeout": 120,
+    "max_connections_percent": 90,
+    "max_idle_connections_percent": 50,
+}
+
+# ElastiCache Redis caching tier defaults
+DEFAULT_REDIS = {
+    "enabled": False,
+    "node_type": "cache.r6g.large",
+    "engine_version": "7.1",
+    "cluster_mode": False,
+    "num_node_groups": 1,
+    "replicas_per_node_group": 1,
+}
+
+# Aurora PostgreSQL Serverless v2 defaults (capacity in ACUs)
+DEFAULT_AURORA = {
+    "engine_version": "14.12",
+    "min_capacity": 0.5,
+    "max_capacity": 16,
+    "reader_count": 1,
+}
 
 class DataStack:
     def __init__(self, network, security, config, project_name: str, rds_instance_class: str, rds_allocated_storage: int, environment: str, common_tags: Dict[str, str]):
@@ -13,15 +42,85 @@ class DataStack:
         self.config = config
         self.rds_allocated_storage= rds_allocated_storage
         self.rds_instance_class= rds_instance_class
+        self.rds_storage = self.storage_settings()
+        self.rds_performance_insights_retention = self.config.get_int("rds_performance_insights_retention") or 7
+        self.rds_monitoring_interval = self.config.get_int("rds_monitoring_interval") or 60
+        self.rds_engine_mode = self.config.get("rds_engine_mode") or "instance"
+        if self.rds_engine_mode not in ("instance", "aurora-serverless"):
+            raise Exception(f"Invalid rds_engine_mode '{self.rds_engine_mode}', expected 'instance' or 'aurora-serverless'")
+        self.aurora_config = {**DEFAULT_AURORA, **(self.config.get_object("rds_aurora") or {})}
         
         # Create subnet group
         self.db_subnet_group = self.create_db_subnet_group()
         
-        # Create parameter group
-        self.db_parameter_group = self.create_db_parameter_group()
-        
-        # Create RDS instance
-        self.db_instance = self.create_db_instance()
+        # Create Enhanced Monitoring role
+        self.db_monitoring_role = self.create_db_monitoring_role()
+
+        self.db_instance = None
+        self.db_cluster = None
+        if self.rds_engine_mode == "aurora-serverless":
+            # Create Aurora Serverless v2 cluster with a writer and readers
+            self.db_cluster_parameter_group = self.create_db_cluster_parameter_group()
+            self.db_cluster = self.create_db_cluster()
+            self.db_cluster_instances = self.create_db_cluster_instances()
+        else:
+            # Create parameter group
+            self.db_parameter_group = self.create_db_parameter_group()
+
+            # Create RDS instance
+            self.db_instance = self.create_db_instance()
+
+            # Create read replicas
+            self.db_read_replicas = self.create_db_read_replicas()
+
+        # Create RDS Proxy
+        self.rds_proxy_config = {**DEFAULT_RDS_PROXY, **(self.config.get_object("rds_proxy") or {})}
+        self.db_proxy = self.create_db_proxy() if self.rds_proxy_config["enabled"] else None
+
+        # Create Redis caching tier
+        self.redis_config = {**DEFAULT_REDIS, **(self.config.get_object("redis") or {})}
+        self.redis = self.create_redis_replication_group() if self.redis_config["enabled"] else None
+
+    def storage_settings(self):
+        # Reject storage combinations RDS would refuse before anything is provisioned
+        allocated = int(self.rds_allocated_storage)
+        storage_type = self.config.get("rds_storage_type") or "gp3"
+        iops = self.config.get_int("rds_iops")
+        throughput = self.config.get_int("rds_storage_throughput")
+        max_allocated = self.config.get_int("rds_max_allocated_storage")
+
+        if storage_type not in ("gp2", "gp3", "io1", "io2"):
+            raise Exception(f"Unsupported rds_storage_type '{storage_type}'")
+        if storage_type == "gp2" and (iops or throughput):
+            raise Exception("gp2 storage does not accept rds_iops or rds_storage_throughput")
+        if storage_type == "gp3" and (iops or throughput):
+            if allocated < 400:
+                raise Exception("gp3 IOPS/throughput can only be set with 400 GiB or more (baseline is 3000 IOPS / 125 MiBps)")
+            if iops and not 12000 <= iops <= 64000:
+                raise Exception(f"gp3 rds_iops must be between 12000 and 64000, got {iops}")
+            if throughput and not 500 <= throughput <= 4000:
+                raise Exception(f"gp3 rds_storage_throughput must be between 500 and 4000 MiBps, got {throughput}")
+        if storage_type in ("io1", "io2"):
+            max_ratio = 50 if storage_type == "io1" else 1000
+            if not iops:
+                raise Exception(f"{storage_type} storage requires rds_iops")
+            if allocated < 100:
+                raise Exception(f"{storage_type} storage requires at least 100 GiB, got {allocated}")
+            if not 1000 <= iops <= 256000 or iops > allocated * max_ratio:
+                raise Exception(f"{storage_type} rds_iops must be 1000-256000 and at most {max_ratio} per GiB, got {iops}")
+            if throughput:
+                raise Exception(f"{storage_type} storage does not accept rds_storage_throughput")
+        if max_allocated is not None and max_allocated <= allocated:
+            raise Exception(f"rds_max_allocated_storage ({max_allocated}) must exceed rds_allocated_storage ({allocated})")
+
+        settings = {"allocated_storage": allocated, "storage_type": storage_type}
+        if iops:
+            settings["iops"] = iops
+        if throughput:
+            settings["storage_throughput"] = throughput
+        if max_allocated:
+            settings["max_allocated_storage"] = max_allocated
+        return settings
 
     def create_db_subnet_group(self):
         try:
@@ -36,53 +135,89 @@ class DataStack:
         except Exception as e:
             raise Exception(f"Failed to create RDS-subnet-group: {str(e)}")
 
-    def create_db_parameter_group(self):
+    def create_db_parameter_group(self, instance_class=None):
         try:
+            # Memory-derived settings are sized to one instance class, so a replica
+            # on a different class gets its own group suffixed with that class
+            name = f"{self.project_name}-db-parameter-group"
+            if instance_class and instance_class != self.rds_instance_class:
+                name = f"{name}-{instance_class.replace('.', '-')}"
             return aws.rds.ParameterGroup(
-                f"{self.project_name}-db-parameter-group",
+                name,
                 family="postgres14",
                 description="Custom parameter group for PostgreSQL 14",
-                parameters=[
-                    {
-                    "name": "max_connections",
-                    "value": "100",
-                    "applyMethod": "pending-reboot",
-                    },
-                    {
-                        "name": "shared_buffers",
-                        "value": "16384",
-                        "applyMethod": "pending-reboot",
-                    },
-                    {
-                        "name": "log_statement",
-                        "value": "all",
-                        "applyMethod": "immediate",  
-                    },
-                ],
+                parameters=db_tuning.parameter_group_parameters(
+                    db_tuning.postgres_settings(instance_class or self.rds_instance_class, self.environment)
+                ),
                 tags={
                             **self.common_tags,
-                            'Name': f"{self.project_name}-db-parameter-group"
+                            'Name': name
                         }
             )
         except Exception as e:
             raise Exception(f"Failed to create RDS-parameter-group: {str(e)}")
 
-    def create_db_instance(self):   
+    def create_db_monitoring_role(self):
         try:
-                # Fetch secret dynamically
-            secret_id = self.security.db_secret.id
-            secret_values = secret_id.apply(
-                lambda id: aws.secretsmanager.get_secret_version_output(secret_id=id).secret_string
+            role = aws.iam.Role(
+                f"{self.project_name}-rds-monitoring-role",
+                assume_role_policy=json.dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [{
+                        "Action": "sts:AssumeRole",
+                        "Effect": "Allow",
+                        "Principal": {"Service": "monitoring.rds.amazonaws.com"}
+                    }]
+                }),
+                tags=self.common_tags
+            )
+
+            aws.iam.RolePolicyAttachment(
+                f"{self.project_name}-rds-monitoring-policy",
+                role=role.name,
+                policy_arn="arn:aws:iam::aws:policy/service-role/AmazonRDSEnhancedMonitoringRole"
             )
 
-            # Parse the username and password from the secret
-            username = secret_values.apply(lambda s: json.loads(s)["username"])
-            password = secret_values.apply(lambda s: json.loads(s)["password"])
+            return role
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-monitoring-role: {str(e)}")
+
+    def telemetry_settings(self, instance_class):
+        # Enhanced Monitoring, Performance Insights and PostgreSQL log export
+        settings = {
+            "monitoring_interval": self.rds_monitoring_interval,
+            "monitoring_role_arn": self.db_monitoring_role.arn,
+            "enabled_cloudwatch_logs_exports": ["postgresql", "upgrade"],
+        }
+        if instance_class.startswith("db.t2."):
+            pulumi.log.warn(f"Performance Insights is not supported on {instance_class}; leaving it disabled")
+        else:
+            settings.update({
+                "performance_insights_enabled": True,
+                "performance_insights_kms_key_id": self.security.kms_key.arn,
+                "performance_insights_retention_period": self.rds_performance_insights_retention,
+            })
+        return settings
+
+    def db_credentials(self):
+        # Fetch secret dynamically
+        secret_id = self.security.db_secret.id
+        secret_values = secret_id.apply(
+            lambda id: aws.secretsmanager.get_secret_version_output(secret_id=id).secret_string
+        )
+
+        # Parse the username and password from the secret
+        username = secret_values.apply(lambda s: json.loads(s)["username"])
+        password = secret_values.apply(lambda s: json.loads(s)["password"])
+        return username, password
+
+    def create_db_instance(self):   
+        try:
+            username, password = self.db_credentials()
             # Create RDS instance using the secret values
             return aws.rds.Instance(
                 f"{self.project_name}-postgresql",
-                allocated_storage=self.rds_allocated_storage,
-                storage_type="gp2",
+                **self.rds_storage,
                 engine="postgres",
                 engine_version="14.12",
                 instance_class=self.rds_instance_class,
@@ -92,6 +227,7 @@ class DataStack:
                 vpc_security_group_ids=[self.security.rds_security_group.id],
                 storage_encrypted=True,
                 kms_key_id=self.security.kms_key.arn,
+                **self.telemetry_settings(self.rds_instance_class),
                 username=username,
                 password=password,
                 multi_az=True,
@@ -111,4 +247,282 @@ class DataStack:
         except Exception as e:
             pulumi.log.error(f"Error creating DB instance: {e}")
             raise
-    
\ No newline at end of file
+
+    def create_db_read_replicas(self):
+        try:
+            # rds_read_replicas is a list of {instance_class, availability_zone, iops,
+            # storage_throughput}; all optional. Size comes from the primary, while the
+            # storage type, provisioned I/O and autoscaling limit are copied from it
+            # unless overridden so replicas keep up with the writer.
+            replica_storage = {key: value for key, value in self.rds_storage.items() if key != "allocated_storage"}
+            # Replicas on the primary's class share its parameter group
+            parameter_groups = {self.rds_instance_class: self.db_parameter_group}
+            replicas = []
+            for i, replica in enumerate(self.config.get_object("rds_read_replicas") or []):
+                placement = {"availability_zone": replica["availability_zone"]} if replica.get("availability_zone") else {}
+                instance_class = replica.get("instance_class", self.rds_instance_class)
+                if instance_class not in parameter_groups:
+                    parameter_groups[instance_class] = self.create_db_parameter_group(instance_class)
+                storage = {
+                    **replica_storage,
+                    **{key: replica[key] for key in ("iops", "storage_throughput") if key in replica},
+                }
+                replicas.append(aws.rds.Instance(
+                    f"{self.project_name}-postgresql-replica-{i}",
+                    replicate_source_db=self.db_instance.identifier,
+                    instance_class=instance_class,
+                    **placement,
+                    **storage,
+                    parameter_group_name=parameter_groups[instance_class].name,
+                    vpc_security_group_ids=[self.security.rds_security_group.id],
+                    storage_encrypted=True,
+                    kms_key_id=self.security.kms_key.arn,
+                    **self.telemetry_settings(instance_class),
+                    publicly_accessible=False,
+                    auto_minor_version_upgrade=True,
+                    backup_retention_period=0,
+                    skip_final_snapshot=True,
+                    tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-postgresql-replica-{i}",
+                        'Role': 'Reader'
+                    }
+                ))
+            return replicas
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-read-replicas: {str(e)}")
+
+    def create_db_cluster_parameter_group(self):
+        try:
+            return aws.rds.ClusterParameterGroup(
+                f"{self.project_name}-db-cluster-parameter-group",
+                family="aurora-postgresql14",
+                description="Custom cluster parameter group for Aurora PostgreSQL 14",
+                parameters=db_tuning.parameter_group_parameters(
+                    db_tuning.aurora_settings(
+                        self.aurora_config["min_capacity"], self.aurora_config["max_capacity"], self.environment
+                    )
+                ),
+                tags={
+                            **self.common_tags,
+                            'Name': f"{self.project_name}-db-cluster-parameter-group"
+                        }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-cluster-parameter-group: {str(e)}")
+
+    def create_db_cluster(self):
+        try:
+            username, password = self.db_credentials()
+            return aws.rds.Cluster(
+                f"{self.project_name}-aurora-postgresql",
+                engine="aurora-postgresql",
+                engine_mode="provisioned",
+                engine_version=self.aurora_config["engine_version"],
+                database_name=f"{self.project_name}_db",
+                master_username=username,
+                master_password=password,
+                db_cluster_parameter_group_name=self.db_cluster_parameter_group.name,
+                db_subnet_group_name=self.db_subnet_group.name,
+                vpc_security_group_ids=[self.security.rds_security_group.id],
+                serverlessv2_scaling_configuration={
+                    "min_capacity": self.aurora_config["min_capacity"],
+                    "max_capacity": self.aurora_config["max_capacity"],
+                },
+                storage_encrypted=True,
+                kms_key_id=self.security.kms_key.arn,
+                enabled_cloudwatch_logs_exports=["postgresql"],
+                backup_retention_period=7,
+                preferred_backup_window="03:00-04:00",
+                preferred_maintenance_window="Mon:04:00-Mon:05:00",
+                deletion_protection=False,  # Change to true in prod
+                skip_final_snapshot=False,
+                final_snapshot_identifier=f"{self.project_name}-aurora-final-snapshot",
+                tags={
+                    **self.common_tags,
+                    'Name': f"{self.project_name}-aurora-postgresql"
+                }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-cluster: {str(e)}")
+
+    def create_db_cluster_instances(self):
+        try:
+            # Log export is configured on the cluster, not on its instances
+            telemetry = self.telemetry_settings("db.serverless")
+            telemetry.pop("enabled_cloudwatch_logs_exports")
+
+            instances = []
+            for i in range(1 + self.aurora_config["reader_count"]):
+                role = "writer" if i == 0 else f"reader-{i}"
+                instances.append(aws.rds.ClusterInstance(
+                    f"{self.project_name}-aurora-{role}",
+                    cluster_identifier=self.db_cluster.id,
+                    engine=self.db_cluster.engine,
+                    engine_version=self.db_cluster.engine_version,
+                    instance_class="db.serverless",
+                    db_subnet_group_name=self.db_subnet_group.name,
+                    promotion_tier=min(i, 15),
+                    publicly_accessible=False,
+                    auto_minor_version_upgrade=True,
+                    **telemetry,
+                    tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-aurora-{role}",
+                        'Role': 'Writer' if i == 0 else 'Reader'
+                    }
+                ))
+            return instances
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-cluster-instances: {str(e)}")
+
+    @property
+    def writer_endpoint(self):
+        if self.db_cluster:
+            return self.db_cluster.endpoint
+        return self.db_instance.endpoint
+
+    @property
+    def reader_endpoints(self):
+        if self.db_cluster:
+            return [self.db_cluster.reader_endpoint]
+        return [replica.endpoint for replica in self.db_read_replicas]
+
+    def create_db_proxy(self):
+        try:
+            role = aws.iam.Role(
+                f"{self.project_name}-rds-proxy-role",
+                assume_role_policy=json.dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [{
+                        "Action": "sts:AssumeRole",
+                        "Effect": "Allow",
+                        "Principal": {"Service": "rds.amazonaws.com"}
+                    }]
+                }),
+                tags=self.common_tags
+            )
+
+            # The proxy reads the same credentials the instance was created with
+            aws.iam.RolePolicy(
+                f"{self.project_name}-rds-proxy-policy",
+                role=role.id,
+                policy=pulumi.Output.json_dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": "secretsmanager:GetSecretValue",
+                            "Resource": self.security.db_secret.arn
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": "kms:Decrypt",
+                            "Resource": self.security.kms_key.arn
+                        }
+                    ]
+                })
+            )
+
+            proxy = aws.rds.Proxy(
+                f"{self.project_name}-rds-proxy",
+                engine_family="POSTGRESQL",
+                role_arn=role.arn,
+                vpc_subnet_ids=self.network.private_subnet_ids,
+                vpc_security_group_ids=[self.security.rds_proxy_security_group.id],
+                require_tls=self.rds_proxy_config["require_tls"],
+                idle_client_timeout=self.rds_proxy_config["idle_client_timeout"],
+                auths=[{
+                    "auth_scheme": "SECRETS",
+                    "secret_arn": self.security.db_secret.arn,
+                    "iam_auth": "DISABLED"
+                }],
+                tags={
+                    **self.common_tags,
+                    'Name': f"{self.project_name}-rds-proxy"
+                }
+            )
+
+            aws.rds.ProxyDefaultTargetGroup(
+                f"{self.project_name}-rds-proxy-target-group",
+                db_proxy_name=proxy.name,
+                connection_pool_config={
+                    "connection_borrow_timeout": self.rds_proxy_config["connection_borrow_timeout"],
+                    "max_connections_percent": self.rds_proxy_config["max_connections_percent"],
+                    "max_idle_connections_percent": self.rds_proxy_config["max_idle_connections_percent"],
+                }
+            )
+
+            if self.db_cluster:
+                target = {"db_cluster_identifier": self.db_cluster.cluster_identifier}
+            else:
+                target = {"db_instance_identifier": self.db_instance.identifier}
+            aws.rds.ProxyTarget(
+                f"{self.project_name}-rds-proxy-target",
+                db_proxy_name=proxy.name,
+                target_group_name="default",
+                **target
+            )
+
+            return proxy
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-proxy: {str(e)}")
+
+    def create_redis_replication_group(self):
+        try:
+            subnet_group = aws.elasticache.SubnetGroup(
+                f"{self.project_name}-redis-subnet-group",
+                subnet_ids=self.network.private_subnet_ids,
+                tags={
+                    **self.common_tags,
+                    'Name': f"{self.project_name}-redis-subnet-group"
+                }
+            )
+
+            replicas = self.redis_config["replicas_per_node_group"]
+            major_version = self.redis_config["engine_version"].split(".")[0]
+            if self.redis_config["cluster_mode"]:
+                topology = {
+                    "cluster_mode": "enabled",
+                    "num_node_groups": self.redis_config["num_node_groups"],
+                    "replicas_per_node_group": replicas,
+                    "parameter_group_name": f"default.redis{major_version}.cluster.on",
+                }
+            else:
+                topology = {
+                    "num_cache_clusters": 1 + replicas,
+                    "parameter_group_name": f"default.redis{major_version}",
+                }
+            # Failover and Multi-AZ need at least one replica
+            has_replicas = replicas > 0
+
+            return aws.elasticache.ReplicationGroup(
+                f"{self.project_name}-redis",
+                description=f"Redis cache for {self.project_name}",
+                engine="redis",
+                engine_version=self.redis_config["engine_version"],
+                node_type=self.redis_config["node_type"],
+                port=6379,
+                **topology,
+                automatic_failover_enabled=has_replicas or self.redis_config["cluster_mode"],
+                multi_az_enabled=has_replicas,
+                subnet_group_name=subnet_group.name,
+                security_group_ids=[self.security.redis_security_group.id],
+                at_rest_encryption_enabled=True,
+                kms_key_id=self.security.kms_key.arn,
+                transit_encryption_enabled=True,
+                snapshot_retention_limit=1,
+                tags={
+                    **self.common_tags,
+                    'Name': f"{self.project_name}-redis"
+                }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create Redis-replication-group: {str(e)}")
+
+    @property
+    def redis_primary_endpoint(self):
+        # Cluster mode exposes a configuration endpoint instead of a primary endpoint
+        if self.redis_config["cluster_mode"]:
+            return self.redis.configuration_endpoint_address
+        return self.redis.primary_endpoint_address
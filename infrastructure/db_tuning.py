@@ -0,0 +1,123 @@
+from typing import Dict, List, Tuple
+
+# (memory GiB, vCPU) per instance size for each RDS instance family
+_BURSTABLE_SIZES = {
+    "micro": (1, 2), "small": (2, 2), "medium": (4, 2),
+    "large": (8, 2), "xlarge": (16, 4), "2xlarge": (32, 8),
+}
+_GENERAL_PURPOSE_SIZES = {
+    "large": (8, 2), "xlarge": (16, 4), "2xlarge": (32, 8), "4xlarge": (64, 16),
+    "8xlarge": (128, 32), "12xlarge": (192, 48), "16xlarge": (256, 64), "24xlarge": (384, 96),
+}
+_MEMORY_OPTIMIZED_SIZES = {
+    "large": (16, 2), "xlarge": (32, 4), "2xlarge": (64, 8), "4xlarge": (128, 16),
+    "8xlarge": (256, 32), "12xlarge": (384, 48), "16xlarge": (512, 64), "24xlarge": (768, 96),
+}
+
+INSTANCE_CLASSES: Dict[str, Tuple[int, int]] = {
+    **{f"db.t2.{size}": (mem, 1 if size in ("micro", "small") else cpu) for size, (mem, cpu) in _BURSTABLE_SIZES.items()},
+    **{f"db.{family}.{size}": spec for family in ("t3", "t4g") for size, spec in _BURSTABLE_SIZES.items()},
+    **{f"db.{family}.{size}": spec for family in ("m5", "m6g", "m6i", "m7g") for size, spec in _GENERAL_PURPOSE_SIZES.items()},
+    **{f"db.{family}.{size}": spec for family in ("r5", "r6g", "r6i", "r7g") for size, spec in _MEMORY_OPTIMIZED_SIZES.items()},
+}
+
+# Statement logging per environment; production only logs DDL and slow statements
+LOGGING_BY_ENVIRONMENT = {
+    "prod": {"log_statement": "ddl", "log_min_duration_statement": 500},
+    "staging": {"log_statement": "mod", "log_min_duration_statement": 200},
+}
+DEFAULT_LOGGING = {"log_statement": "mod", "log_min_duration_statement": 100}
+
+# Parameters that only take effect after a reboot
+STATIC_PARAMETERS = {
+    "shared_buffers", "max_connections", "max_worker_processes",
+    "autovacuum_max_workers", "wal_buffers", "shared_preload_libraries",
+}
+
+# Aurora sizes these from the current capacity or does not allow them to be changed
+AURORA_MANAGED_PARAMETERS = {
+    "max_connections", "shared_buffers", "effective_cache_size", "wal_buffers",
+    "min_wal_size", "max_wal_size", "checkpoint_completion_target", "random_page_cost",
+}
+
+KB_PER_GIB = 1024 * 1024
+PAGES_PER_GIB = KB_PER_GIB // 8
+
+
+def instance_resources(instance_class: str) -> Tuple[int, int]:
+    """Memory (GiB) and vCPU count for an RDS instance class."""
+    if instance_class not in INSTANCE_CLASSES:
+        raise ValueError(f"Unknown RDS instance class '{instance_class}', add it to INSTANCE_CLASSES")
+    return INSTANCE_CLASSES[instance_class]
+
+
+def postgres_settings(instance_class: str, environment: str) -> Dict[str, object]:
+    """Memory, connection, WAL, autovacuum and logging settings sized to the instance class."""
+    memory_gib, vcpus = instance_resources(instance_class)
+    return _settings_for(memory_gib, vcpus, environment)
+
+
+def aurora_settings(min_acu: float, max_acu: float, environment: str) -> Dict[str, object]:
+    """Settings for an Aurora PostgreSQL Serverless v2 cluster parameter group.
+
+    Per-operation memory is sized to the minimum capacity (one ACU is roughly
+    2 GiB) so it stays safe when scaled down, and parallelism to the maximum.
+    Parameters Aurora manages itself as it scales are left out.
+    """
+    memory_gib = max(1, int(min_acu * 2))
+    vcpus = max(2, int(max_acu // 4))
+    settings = _settings_for(memory_gib, vcpus, environment)
+    return {name: value for name, value in settings.items() if name not in AURORA_MANAGED_PARAMETERS}
+
+
+def _settings_for(memory_gib: int, vcpus: int, environment: str) -> Dict[str, object]:
+    """Derive settings from memory and vCPU count.
+
+    Values use PostgreSQL's native units: 8 kB pages for shared_buffers,
+    effective_cache_size and wal_buffers, kB for work_mem and
+    maintenance_work_mem, MB for WAL sizes and ms for durations.
+    """
+    memory_kb = memory_gib * KB_PER_GIB
+
+    # Same formula as the RDS default, LEAST(DBInstanceClassMemory/9531392, 5000)
+    max_connections = min(memory_gib * 1024 ** 3 // 9531392, 5000)
+    shared_buffers_kb = memory_kb // 4
+
+    settings = {
+        "max_connections": max_connections,
+        "shared_buffers": shared_buffers_kb // 8,
+        "effective_cache_size": memory_gib * PAGES_PER_GIB * 3 // 4,
+        # Leave room for several sort/hash nodes per connection
+        "work_mem": max(4096, (memory_kb - shared_buffers_kb) // (max_connections * 3)),
+        "maintenance_work_mem": min(memory_kb // 16, 2 * KB_PER_GIB),
+        "wal_buffers": 2048,
+        "min_wal_size": 1024 if memory_gib < 32 else 2048,
+        "max_wal_size": 4096 if memory_gib < 32 else 16384,
+        "checkpoint_completion_target": 0.9,
+        "max_worker_processes": max(8, vcpus),
+        "max_parallel_workers": vcpus,
+        "max_parallel_workers_per_gather": max(1, vcpus // 4),
+        "autovacuum_max_workers": max(3, vcpus // 2),
+        "autovacuum_vacuum_scale_factor": 0.05,
+        "autovacuum_analyze_scale_factor": 0.02,
+        "autovacuum_vacuum_cost_limit": 2000,
+        "random_page_cost": 1.1,
+        # Per-statement latency and wait statistics for Performance Insights / pg_stat_statements
+        "shared_preload_libraries": "pg_stat_statements",
+        "pg_stat_statements.track": "all",
+        "track_io_timing": 1,
+    }
+    settings.update(LOGGING_BY_ENVIRONMENT.get(environment, DEFAULT_LOGGING))
+    return settings
+
+
+def parameter_group_parameters(settings: Dict[str, object]) -> List[Dict[str, str]]:
+    """Format settings as aws.rds.ParameterGroup parameters."""
+    return [
+        {
+            "name": name,
+            "value": str(value),
+            "apply_method": "pending-reboot" if name in STATIC_PARAMETERS else "immediate",
+        }
+        for name, value in settings.items()
+    ]
@@ -0,0 +1,137 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Declarative defaults for monitoring:index_lifecycle
+DEFAULT_INDEX_LIFECYCLE = {
+    "data_stream_type": "logs",
+    "data_stream_dataset": "beats",
+    "shards": 1,
+    "replicas": 1,
+    "rollover": {"max_primary_shard_size": "50gb", "max_age": "1d"},
+    "warm_after": "2d",
+    "force_merge_segments": 1,
+    "shrink_shards": 1,
+    "delete_after": "30d",
+    # Cold phase remounts indices from the snapshot repository without replicas;
+    # only applied with monitoring:snapshots.searchable_snapshots enabled
+    "cold_after": None,
+    "schedule": "rate(1 day)",
+}
+
+
+def bootstrap_script(request_count: int, health_attempts: int = 20) -> str:
+    """Wait for the cluster, then PUT each REQUEST_<i>_PATH/BODY in order.
+
+    Every call is idempotent. A failed request is reported and the rest still
+    run; the script exits non-zero at the end if any of them failed. If the
+    cluster is not yellow after `health_attempts` checks (roughly 40s each) the
+    script gives up with exit 0, so containers that depend on it still start
+    and the scheduled run applies the requests later.
+    """
+    steps = [
+        "ATTEMPTS=0",
+        "until curl -sf \"$ES_URL/_cluster/health?wait_for_status=yellow&timeout=30s\"; do "
+        f"ATTEMPTS=$((ATTEMPTS + 1)); if [ $ATTEMPTS -ge {health_attempts} ]; then "
+        "echo \"$ES_URL not healthy, skipping bootstrap\" >&2; exit 0; fi; sleep 10; done",
+        "FAILED=0",
+    ]
+    for i in range(request_count):
+        steps.append(
+            f"curl -sSf -X PUT \"$ES_URL/$REQUEST_{i}_PATH\" -H 'Content-Type: application/json' "
+            f"-d \"$REQUEST_{i}_BODY\" || {{ echo \"PUT $REQUEST_{i}_PATH failed\" >&2; FAILED=1; }}"
+        )
+    steps.append("exit $FAILED")
+    return "; ".join(steps)
+
+
+def ilm_policy(lifecycle: Dict[str, Any], snapshot_repository: Optional[str] = None) -> Dict[str, Any]:
+    """Hot rollover, warm force-merge/shrink, optional cold and delete phases."""
+    warm_actions = {"forcemerge": {"max_num_segments": lifecycle["force_merge_segments"]}}
+    if lifecycle.get("shrink_shards"):
+        warm_actions["shrink"] = {"number_of_shards": lifecycle["shrink_shards"]}
+    phases = {
+        "hot": {"actions": {"rollover": lifecycle["rollover"]}},
+        "warm": {"min_age": lifecycle["warm_after"], "actions": warm_actions},
+    }
+    if lifecycle.get("cold_after") and snapshot_repository:
+        phases["cold"] = {
+            "min_age": lifecycle["cold_after"],
+            "actions": {"searchable_snapshot": {"snapshot_repository": snapshot_repository}},
+        }
+    phases["delete"] = {"min_age": lifecycle["delete_after"], "actions": {"delete": {}}}
+    return {"policy": {"phases": phases}}
+
+
+def index_template(lifecycle: Dict[str, Any], policy_name: str) -> Dict[str, Any]:
+    """Data stream template with shard counts and the ILM policy attached.
+
+    Priority 200 takes precedence over the built-in logs-*-* template.
+    """
+    pattern = f"{lifecycle['data_stream_type']}-{lifecycle['data_stream_dataset']}-*"
+    return {
+        "index_patterns": [pattern],
+        "data_stream": {},
+        "priority": 200,
+        "template": {
+            "settings": {
+                "index.number_of_shards": lifecycle["shards"],
+                "index.number_of_replicas": lifecycle["replicas"],
+                "index.lifecycle.name": policy_name,
+            }
+        },
+    }
+
+
+def snapshot_repository(bucket: str, base_path: str) -> Dict[str, Any]:
+    return {"type": "s3", "settings": {"bucket": bucket, "base_path": base_path, "compress": True}}
+
+
+def snapshot_policy(snapshots: Dict[str, Any], repository: str) -> Dict[str, Any]:
+    """Snapshot lifecycle (SLM) policy covering every index and the cluster state."""
+    return {
+        "schedule": snapshots["schedule"],
+        "name": "<scheduled-snap-{now/d}>",
+        "repository": repository,
+        "config": {"indices": ["*"], "include_global_state": True},
+        "retention": snapshots["retention"],
+    }
+
+
+def bootstrap_requests(lifecycle: Dict[str, Any], policy_name: str, template_name: str,
+                       snapshots: Optional[Dict[str, Any]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """Ordered (path, body) requests; the repository must exist before policies reference it.
+
+    The cold phase is only added when snapshots enable searchable_snapshots, which
+    needs an Enterprise license; the basic license rejects the whole ILM policy.
+    """
+    requests = []
+    cold_repository = None
+    if snapshots:
+        repository = snapshots["repository"]
+        requests.append((f"_snapshot/{repository}", snapshot_repository(snapshots["bucket"], snapshots["base_path"])))
+        requests.append((f"_slm/policy/{repository}-scheduled", snapshot_policy(snapshots, repository)))
+        if snapshots.get("searchable_snapshots"):
+            cold_repository = repository
+    requests.append((f"_ilm/policy/{policy_name}", ilm_policy(lifecycle, cold_repository)))
+    requests.append((f"_index_template/{template_name}", index_template(lifecycle, policy_name)))
+    return requests
+
+
+def bootstrap_environment(es_url: str, requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, str]]:
+    environment = [{"name": "ES_URL", "value": es_url}]
+    for i, (path, body) in enumerate(requests):
+        environment.append({"name": f"REQUEST_{i}_PATH", "value": path})
+        environment.append({"name": f"REQUEST_{i}_BODY", "value": json.dumps(body)})
+    return environment
+
+
+def logstash_output(lifecycle: Dict[str, Any], namespace: str) -> Dict[str, Any]:
+    """Elasticsearch output writing to the managed data stream."""
+    return {"plugin": "elasticsearch", "settings": {
+        "hosts": ["${ELASTICSEARCH_HOSTS}"],
+        "data_stream": True,
+        "data_stream_type": lifecycle["data_stream_type"],
+        "data_stream_dataset": lifecycle["data_stream_dataset"],
+        "data_stream_namespace": namespace,
+        "http_compression": True,
+    }}
@@ -0,0 +1,61 @@
+import pulumi_aws as aws
+from typing import Any, Callable, Dict, Tuple
+
+# Process-wide cache for provider invokes. Data-source lookups such as
+# get_availability_zones are blocking round-trips, so each distinct call is
+# made once per program run and shared by every stack.
+_cache: Dict[Tuple[str, str], Any] = {}
+_stats = {"hits": 0, "misses": 0}
+_enabled = True
+
+
+def _cache_key(fn: Callable, kwargs: Dict[str, Any]) -> Tuple[str, str]:
+    name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+    args = repr(sorted(kwargs.items()))
+    return name, args
+
+
+def cached_invoke(fn: Callable, bypass: bool = False, **kwargs):
+    """Call a provider invoke once per (function, args) and reuse the result."""
+    if bypass or not _enabled:
+        _stats["misses"] += 1
+        return fn(**kwargs)
+
+    key = _cache_key(fn, kwargs)
+    if key in _cache:
+        _stats["hits"] += 1
+        return _cache[key]
+
+    _stats["misses"] += 1
+    result = fn(**kwargs)
+    _cache[key] = result
+    return result
+
+
+def invalidate():
+    """Drop every cached invoke result and reset the hit/miss counters."""
+    _cache.clear()
+    _stats["hits"] = 0
+    _stats["misses"] = 0
+
+
+def set_enabled(enabled: bool):
+    """Globally switch caching on or off (off forces every call through)."""
+    global _enabled
+    _enabled = enabled
+
+
+def cache_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+def get_availability_zones(state: str = "available"):
+    return cached_invoke(aws.get_availability_zones, state=state)
+
+
+def get_region():
+    return cached_invoke(aws.get_region)
+
+
+def get_caller_identity():
+    return cached_invoke(aws.get_caller_identity)
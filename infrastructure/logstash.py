@@ -0,0 +1,69 @@
+from typing import Any, Dict, List
+
+# Pipeline used when monitoring:logstash does not override a section
+DEFAULT_PIPELINE = {
+    "inputs": [
+        {"plugin": "beats", "settings": {"port": 5044}},
+    ],
+    "filters": [],
+    "outputs": [
+        {"plugin": "elasticsearch", "settings": {
+            "hosts": ["${ELASTICSEARCH_HOSTS}"],
+            "index": "logstash-%{+YYYY.MM.dd}",
+            "http_compression": True,
+        }},
+    ],
+}
+
+# logstash.yml throughput settings; workers defaults to the sizing helper's value.
+# A persisted queue is kept on EFS by MonitoringStack so it survives task replacement.
+DEFAULT_PIPELINE_SETTINGS = {
+    "workers": None,
+    "batch_size": 1000,
+    "batch_delay": 50,
+    "queue_type": "persisted",
+    "queue_max_bytes": "1gb",
+}
+
+
+def render_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(render_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{ " + " ".join(f"{render_value(k)} => {render_value(v)}" for k, v in value.items()) + " }"
+    # Logstash strings have no escapes by default, so switch quote style instead
+    value = str(value)
+    return f"'{value}'" if '"' in value else f'"{value}"'
+
+
+def render_plugin(entry: Dict[str, Any]) -> str:
+    # {"raw": "..."} passes a hand-written block (e.g. a conditional) through untouched
+    if "raw" in entry:
+        return entry["raw"]
+    settings = "\n".join(f"    {key} => {render_value(value)}" for key, value in entry.get("settings", {}).items())
+    return f"  {entry['plugin']} {{\n{settings}\n  }}"
+
+
+def render_pipeline(pipeline: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Render structured inputs/filters/outputs into Logstash pipeline syntax."""
+    sections = []
+    for section, key in (("input", "inputs"), ("filter", "filters"), ("output", "outputs")):
+        plugins = "\n".join(render_plugin(entry) for entry in pipeline.get(key, []))
+        sections.append(f"{section} {{\n{plugins}\n}}")
+    return "\n".join(sections) + "\n"
+
+
+def pipeline_environment(settings: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Container environment for logstash.yml settings (the image maps PIPELINE_WORKERS to pipeline.workers)."""
+    names = {
+        "workers": "PIPELINE_WORKERS",
+        "batch_size": "PIPELINE_BATCH_SIZE",
+        "batch_delay": "PIPELINE_BATCH_DELAY",
+        "queue_type": "QUEUE_TYPE",
+        "queue_max_bytes": "QUEUE_MAX_BYTES",
+    }
+    return [{"name": names[key], "value": str(settings[key])} for key in names if settings.get(key) is not None]
@@ -1,7 +1,152 @@
 # infrastructure/monitoring.py
+import os
 import pulumi
 import pulumi_aws as aws
+import pulumi_docker as docker
 from typing import Dict
+from infrastructure import sizing
+from infrastructure import logstash
+from infrastructure import invokes
+from infrastructure import index_lifecycle
+
+# Elasticsearch cluster layout: fixed, individually named master-eligible
+# nodes (so the cluster can bootstrap) plus an autoscaled data/ingest tier.
+DEFAULT_ELASTICSEARCH_TOPOLOGY = {
+    "cluster_name": "elk",
+    "master_count": 3,
+    "data_count": 2,
+    # Passes cluster.initial_master_nodes to the masters; set to false once the
+    # cluster has formed so a master restarting on empty storage cannot
+    # bootstrap a second cluster
+    "bootstrap_cluster": True,
+}
+
+DEFAULT_ELASTICSEARCH_STORAGE = {
+    "type": "efs",                     # efs | ephemeral
+    "throughput_mode": "elastic",      # elastic | provisioned | bursting
+    "provisioned_throughput_mibps": None,
+    "ephemeral_storage_gib": 50,
+}
+
+# Per-service scaling: target tracking on CPU/memory/ALB requests plus
+# optional step scaling on custom CloudWatch metrics (monitoring:autoscaling).
+# A step entry only scales out unless it has a `scale_in` block; without one,
+# scale-in is left to the target-tracking policies.
+DEFAULT_AUTOSCALING = {
+    "elasticsearch": {
+        "min_capacity": 2,
+        "max_capacity": 5,
+        "cpu_target": 70,
+        "scale_in_cooldown": 600,
+        "scale_out_cooldown": 120,
+        "step_scaling": [],
+    },
+    "logstash": {
+        "min_capacity": 2,
+        "max_capacity": 10,
+        "cpu_target": 70,
+        "scale_in_cooldown": 300,
+        "scale_out_cooldown": 60,
+        "step_scaling": [],
+    },
+    "kibana": {
+        "min_capacity": 1,
+        "max_capacity": 3,
+        "request_count_target": 500,
+        "scale_in_cooldown": 300,
+        "scale_out_cooldown": 60,
+        "step_scaling": [],
+    },
+}
+
+# Optional Kinesis stream between shippers and Logstash to absorb ingest bursts
+DEFAULT_INGEST_BUFFER = {
+    "enabled": False,
+    "stream_mode": "PROVISIONED",      # PROVISIONED | ON_DEMAND
+    "shard_count": 2,
+    "retention_hours": 24,
+}
+
+LOGSTASH_IMAGE = "docker.elastic.co/logstash/logstash:8.10.0"
+
+# The Kinesis input is not bundled with the stock image, so it is baked into
+# an image built from this context and pushed to ECR
+LOGSTASH_KINESIS_IMAGE_CONTEXT = os.path.join(os.path.dirname(__file__), "..", "docker", "logstash-kinesis")
+
+# S3 snapshot repository registered with Elasticsearch plus a snapshot
+# lifecycle (SLM) policy; snapshot retention is left to SLM, not S3 expiry.
+DEFAULT_SNAPSHOTS = {
+    "enabled": False,
+    "repository": "s3-snapshots",
+    "base_path": "elasticsearch",
+    "schedule": "0 30 1 * * ?",
+    "retention": {"expire_after": "30d", "min_count": 5, "max_count": 50},
+    "infrequent_access_after_days": 30,
+    # Mount indices past index_lifecycle.cold_after as searchable snapshots;
+    # requires an Enterprise license (the stock image runs basic)
+    "searchable_snapshots": False,
+}
+
+# Fargate task sizes (CPU units / MiB) per ELK component
+DEFAULT_TASK_SIZES = {
+    "elasticsearch": {"cpu": 1024, "memory": 2048},
+    "elasticsearch-master": {"cpu": 1024, "memory": 2048},
+    "logstash": {"cpu": 256, "memory": 512},
+    "kibana": {"cpu": 1024, "memory": 2048},
+}
+
+ELASTICSEARCH_DATA_PATH = "/usr/share/elasticsearch/data"
+
+LOGSTASH_DATA_PATH = "/usr/share/logstash/persistent"
+LOGSTASH_DESIRED_COUNT = 2
+
+
+def data_slot_script(root: str, count_var: str, dir_var: str, lock_name: str) -> str:
+    """Shell that claims a reusable data directory on a shared volume.
+
+    A task takes the first free slot (data-0 .. data-<$count_var - 1>) by holding a
+    lock under slots/ for the life of the task, so a replacement task reuses a
+    stopped task's directory instead of starting empty. The lock is held on fd 9,
+    which survives the exec into the service; EFS releases it when the task dies.
+    Slots at or above the count (left after max_capacity is lowered) and per-task
+    directories from older layouts are removed once nothing holds their lock
+    (`lock_name` is the lock file the service itself keeps in its data path).
+    """
+    return (
+        f"ROOT={root}; mkdir -p $ROOT/slots; "
+        f"i=0; while [ $i -lt ${count_var} ]; do "
+        "exec 9>$ROOT/slots/data-$i.lock; "
+        f"if flock -n 9; then {dir_var}=data-$i; break; fi; "
+        "i=$((i+1)); done; "
+        f"[ -n \"${dir_var}\" ] || {{ echo 'No free data slot' >&2; exit 1; }}; mkdir -p $ROOT/${dir_var}; "
+        "for DIR in $ROOT/*/; do NAME=$(basename $DIR); "
+        "case $NAME in slots|es-master-*) continue;; "
+        f"data-*) [ ${{NAME#data-}} -lt ${count_var} ] && continue; LOCK=$ROOT/slots/$NAME.lock;; "
+        f"*) LOCK=$DIR/{lock_name};; esac; "
+        "[ -e $LOCK ] && { flock -n 8 && rm -rf $DIR && rm -f $ROOT/slots/$NAME.lock; } 8>>$LOCK; "
+        "done; "
+    )
+
+
+# Publish the task's AZ as node.attr.zone so shard allocation is zone-aware,
+# and give every node a stable directory on the shared data volume (masters
+# use their fixed node name, data nodes claim a slot) so its data survives
+# task replacement. Fargate only exposes the AZ through the task metadata endpoint.
+ELASTICSEARCH_ENTRYPOINT = (
+    "ZONE=$(curl -s ${ECS_CONTAINER_METADATA_URI_V4}/task | grep -o '\"AvailabilityZone\":\"[^\"]*' | cut -d'\"' -f4); "
+    "[ -n \"$ES_NODE_DIR\" ] || { "
+    + data_slot_script(ELASTICSEARCH_DATA_PATH, "ES_DATA_SLOTS", "ES_NODE_DIR", "node.lock")
+    + "}; "
+    "exec env node.attr.zone=$ZONE node.name=$ES_NODE_DIR path.data=" + ELASTICSEARCH_DATA_PATH + "/$ES_NODE_DIR "
+    "/bin/tini -- /usr/local/bin/docker-entrypoint.sh eswrapper"
+)
+
+# Keep path.data (persistent queue and dead letter queue) in a claimed slot on
+# EFS, so a replacement task picks up and drains a stopped task's queue
+LOGSTASH_DATA_SLOT_ENTRYPOINT = (
+    data_slot_script(LOGSTASH_DATA_PATH, "LS_DATA_SLOTS", "LS_DATA_DIR", ".lock")
+    + "exec /usr/local/bin/docker-entrypoint --path.data " + LOGSTASH_DATA_PATH + "/$LS_DATA_DIR"
+)
 
 class MonitoringStack:
     def __init__(self, network, security, compute, project_name: str, environment: str, common_tags: Dict[str, str]):
@@ -12,10 +157,98 @@ class MonitoringStack:
         self.project_name = project_name
         self.environment = environment
 
+        # Monitoring configuration
+        config = pulumi.Config("monitoring")
+        self.es_topology = {
+            **DEFAULT_ELASTICSEARCH_TOPOLOGY,
+            **(config.get_object("elasticsearch_topology") or {}),
+        }
+        task_sizes = {**DEFAULT_TASK_SIZES, **(config.get_object("task_sizes") or {})}
+        self.elasticsearch_master_size = sizing.elasticsearch_sizing(**task_sizes["elasticsearch-master"])
+        self.elasticsearch_size = sizing.elasticsearch_sizing(**task_sizes["elasticsearch"])
+        self.logstash_size = sizing.logstash_sizing(**task_sizes["logstash"])
+        self.kibana_size = sizing.kibana_sizing(**task_sizes["kibana"])
+        self.ingest_buffer = {
+            **DEFAULT_INGEST_BUFFER,
+            **(config.get_object("ingest_buffer") or {}),
+        }
+        self.ingest_stream_name = f"{self.project_name}-{self.environment}-log-ingest"
+        # Prebuilt Logstash image (must include the Kinesis input when the buffer is enabled)
+        self.logstash_image_override = config.get("logstash_image")
+        self.autoscaling_config = config.get_object("autoscaling") or {}
+        self.scaling_schedules = config.get_object("scaling_schedules") or {}
+        self.index_lifecycle = {
+            **index_lifecycle.DEFAULT_INDEX_LIFECYCLE,
+            **(config.get_object("index_lifecycle") or {}),
+        }
+        logstash_config = config.get_object("logstash") or {}
+        self.logstash_settings = {
+            **logstash.DEFAULT_PIPELINE_SETTINGS,
+            "workers": self.logstash_size["pipeline_workers"],
+            **{key: value for key, value in logstash_config.items() if key in logstash.DEFAULT_PIPELINE_SETTINGS},
+        }
+        self.logstash_pipeline = {
+            **logstash.DEFAULT_PIPELINE,
+            **{key: value for key, value in logstash_config.items() if key in logstash.DEFAULT_PIPELINE},
+        }
+        if "outputs" not in logstash_config:
+            # Write to a data stream whose rollover and retention are managed by ILM
+            self.logstash_pipeline["outputs"] = [index_lifecycle.logstash_output(self.index_lifecycle, self.environment)]
+        if self.ingest_buffer["enabled"] and "inputs" not in logstash_config:
+            # Consume from the stream; Beats stays available for shippers not yet moved over
+            self.logstash_pipeline["inputs"] = [
+                *logstash.DEFAULT_PIPELINE["inputs"],
+                {"plugin": "kinesis", "settings": {
+                    "kinesis_stream_name": self.ingest_stream_name,
+                    "application_name": f"{self.ingest_stream_name}-logstash",
+                    "region": invokes.get_region().name,
+                    "initial_position_in_stream": "TRIM_HORIZON",
+                    "codec": "json",
+                }},
+            ]
+        self.es_storage = self.storage_settings({
+            **DEFAULT_ELASTICSEARCH_STORAGE,
+            **(config.get_object("elasticsearch_storage") or {}),
+        })
+        self.snapshots = {
+            **DEFAULT_SNAPSHOTS,
+            **(config.get_object("snapshots") or {}),
+        }
+        # Bucket names are global, so include the account to keep them unique
+        self.snapshot_bucket_name = (
+            f"{self.project_name}-{self.environment}-es-snapshots-{invokes.get_caller_identity().account_id}"
+        )
+
+        if self.snapshots["enabled"]:
+            self.snapshot_bucket = self.create_snapshot_bucket()
+            self.create_snapshot_bucket_policy()
+
+        # The persistent queue must outlive the task to protect in-flight events
+        self.logstash_durable_queue = self.logstash_settings["queue_type"] == "persisted"
+
+        if self.es_storage["type"] == "efs" or self.logstash_durable_queue:
+            self.elasticsearch_file_system = self.create_elasticsearch_file_system()
+        if self.es_storage["type"] == "efs":
+            self.elasticsearch_access_point = self.create_elasticsearch_access_point()
+        if self.logstash_durable_queue:
+            self.logstash_access_point = self.create_logstash_access_point()
+
+        self.elasticsearch_master_nodes = [f"es-master-{i}" for i in range(self.es_topology["master_count"])]
+        self.elasticsearch_master_tasks = [self.create_elasticsearch_master_task(node) for node in self.elasticsearch_master_nodes]
+        self.elasticsearch_master_services = [
+            self.create_elasticsearch_master_service(node, task)
+            for node, task in zip(self.elasticsearch_master_nodes, self.elasticsearch_master_tasks)
+        ]
         self.elasticsearch_task = self.create_elasticsearch_task()
         self.elasticsearch_service = self.create_elasticsearch_service()
+        if self.ingest_buffer["enabled"]:
+            self.ingest_stream = self.create_ingest_stream()
+            self.create_ingest_stream_policy()
+        self.logstash_image = self.create_logstash_image()
         self.logstash_task = self.create_logstash_task()
         self.logstash_service = self.create_logstash_service()
+        self.index_bootstrap_task = self.create_index_bootstrap_task()
+        self.index_bootstrap_schedule = self.create_index_bootstrap_schedule()
         self.kibana_task = self.create_kibana_task()
         self.kibana_service = self.create_kibana_service()
 
@@ -23,9 +256,302 @@ class MonitoringStack:
         self.elasticsearch_autoscaling = self.create_auto_scaling(self.elasticsearch_service, "elasticsearch")
         self.logstash_autoscaling = self.create_auto_scaling(self.logstash_service, "logstash")
         self.kibana_autoscaling = self.create_auto_scaling(self.kibana_service, "kibana")
+
+        self.create_scheduled_scaling(self.elasticsearch_autoscaling, "elasticsearch")
+        self.create_scheduled_scaling(self.logstash_autoscaling, "logstash")
+        self.create_scheduled_scaling(self.kibana_autoscaling, "kibana")
         
 
 
+    def elasticsearch_environment(self, roles):
+        # Nodes find each other through the master discovery service's A records
+        return [
+            {"name": "cluster.name", "value": self.es_topology["cluster_name"]},
+            {"name": "node.roles", "value": roles},
+            {"name": "discovery.seed_hosts", "value": f"elasticsearch-master.{self.compute.discovery_namespace_name}"},
+            {"name": "cluster.routing.allocation.awareness.attributes", "value": "zone"},
+            {"name": "network.host", "value": "_site_"},
+            # Binding to a site address enforces the bootstrap checks, and Fargate
+            # cannot raise vm.max_map_count, so use NIO instead of mmap for the store
+            {"name": "node.store.allow_mmap", "value": "false"},
+            {"name": "xpack.security.enabled", "value": "false"},
+            *self.snapshot_client_environment(),
+        ]
+
+    def cluster_bootstrap_environment(self):
+        # Only master-eligible nodes take part in the first election
+        if not self.es_topology["bootstrap_cluster"]:
+            return []
+        return [{"name": "cluster.initial_master_nodes", "value": ",".join(self.elasticsearch_master_nodes)}]
+
+    def snapshot_client_environment(self):
+        if not self.snapshots["enabled"]:
+            return []
+        # Use the regional endpoint so traffic goes through the S3 gateway endpoint;
+        # credentials come from the ECS task role
+        return [{"name": "s3.client.default.endpoint", "value": f"s3.{invokes.get_region().name}.amazonaws.com"}]
+
+    def create_snapshot_bucket(self):
+        try:
+            bucket = aws.s3.BucketV2(
+                f"{self.project_name}-es-snapshots",
+                bucket=self.snapshot_bucket_name,
+                tags={
+                    **self.common_tags,
+                    'Name': self.snapshot_bucket_name
+                }
+            )
+
+            aws.s3.BucketPublicAccessBlock(
+                f"{self.project_name}-es-snapshots-public-access-block",
+                bucket=bucket.id,
+                block_public_acls=True,
+                block_public_policy=True,
+                ignore_public_acls=True,
+                restrict_public_buckets=True
+            )
+
+            aws.s3.BucketServerSideEncryptionConfigurationV2(
+                f"{self.project_name}-es-snapshots-encryption",
+                bucket=bucket.id,
+                rules=[{
+                    "apply_server_side_encryption_by_default": {
+                        "sse_algorithm": "aws:kms",
+                        "kms_master_key_id": self.security.kms_key.arn,
+                    },
+                    "bucket_key_enabled": True,
+                }]
+            )
+
+            # Snapshot blobs are shared between snapshots, so objects are never
+            # expired here; only move them to a cheaper (instant retrieval) class
+            aws.s3.BucketLifecycleConfigurationV2(
+                f"{self.project_name}-es-snapshots-lifecycle",
+                bucket=bucket.id,
+                rules=[
+                    {
+                        "id": "infrequent-access",
+                        "status": "Enabled",
+                        "filter": {"prefix": f"{self.snapshots['base_path']}/"},
+                        "transitions": [{
+                            "days": self.snapshots["infrequent_access_after_days"],
+                            "storage_class": "STANDARD_IA",
+                        }],
+                    },
+                    {
+                        "id": "abort-incomplete-uploads",
+                        "status": "Enabled",
+                        "filter": {},
+                        "abort_incomplete_multipart_upload": {"days_after_initiation": 7},
+                    },
+                ]
+            )
+
+            return bucket
+        except Exception as e:
+            raise Exception(f"Failed to create es-snapshots-bucket: {str(e)}")
+
+    def create_snapshot_bucket_policy(self):
+        try:
+            # Scoped to the snapshot bucket and its base path
+            return aws.iam.RolePolicy(
+                f"{self.project_name}-es-snapshots-policy",
+                role=self.security.ecs_task_role.id,
+                policy=pulumi.Output.json_dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": [
+                                "s3:ListBucket",
+                                "s3:GetBucketLocation",
+                                "s3:ListBucketMultipartUploads",
+                                "s3:ListBucketVersions"
+                            ],
+                            "Resource": self.snapshot_bucket.arn
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": [
+                                "s3:GetObject",
+                                "s3:PutObject",
+                                "s3:DeleteObject",
+                                "s3:AbortMultipartUpload",
+                                "s3:ListMultipartUploadParts"
+                            ],
+                            "Resource": pulumi.Output.concat(self.snapshot_bucket.arn, f"/{self.snapshots['base_path']}/*")
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": ["kms:Decrypt", "kms:GenerateDataKey"],
+                            "Resource": self.security.kms_key.arn
+                        }
+                    ]
+                })
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create es-snapshots-policy: {str(e)}")
+
+    def storage_settings(self, storage):
+        # Reject storage settings EFS/Fargate would refuse before anything is provisioned
+        if storage["type"] not in ("efs", "ephemeral"):
+            raise ValueError(f"Unsupported elasticsearch_storage type '{storage['type']}'")
+        if storage["throughput_mode"] not in ("elastic", "provisioned", "bursting"):
+            raise ValueError(f"Unsupported elasticsearch_storage throughput_mode '{storage['throughput_mode']}'")
+        throughput = storage["provisioned_throughput_mibps"]
+        if storage["throughput_mode"] == "provisioned" and not (throughput and throughput > 0):
+            raise ValueError("provisioned throughput_mode requires a positive provisioned_throughput_mibps")
+        if not 21 <= storage["ephemeral_storage_gib"] <= 200:
+            raise ValueError(f"ephemeral_storage_gib must be between 21 and 200, got {storage['ephemeral_storage_gib']}")
+        return storage
+
+    def create_elasticsearch_file_system(self):
+        try:
+            throughput = {"throughput_mode": self.es_storage["throughput_mode"]}
+            if self.es_storage["throughput_mode"] == "provisioned":
+                throughput["provisioned_throughput_in_mibps"] = self.es_storage["provisioned_throughput_mibps"]
+
+            file_system = aws.efs.FileSystem(
+                f"{self.project_name}-elasticsearch-efs",
+                encrypted=True,
+                kms_key_id=self.security.kms_key.arn,
+                performance_mode="generalPurpose",
+                **throughput,
+                tags={
+                    **self.common_tags,
+                    'Name': f"{self.project_name}-elasticsearch-efs"
+                }
+            )
+
+            for i, subnet_id in enumerate(self.network.private_subnet_ids):
+                aws.efs.MountTarget(
+                    f"{self.project_name}-elasticsearch-efs-mt-{i}",
+                    file_system_id=file_system.id,
+                    subnet_id=subnet_id,
+                    security_groups=[self.security.efs_security_group.id]
+                )
+
+            return file_system
+        except Exception as e:
+            raise Exception(f"Failed to create elasticsearch-efs: {str(e)}")
+
+    def create_elasticsearch_access_point(self):
+        try:
+            # The Elasticsearch image runs as uid 1000 / gid 0
+            return aws.efs.AccessPoint(
+                f"{self.project_name}-elasticsearch-efs-ap",
+                file_system_id=self.elasticsearch_file_system.id,
+                posix_user={"uid": 1000, "gid": 0},
+                root_directory={
+                    "path": "/elasticsearch",
+                    "creation_info": {"owner_uid": 1000, "owner_gid": 0, "permissions": "750"},
+                },
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create elasticsearch-efs-access-point: {str(e)}")
+
+    def create_logstash_access_point(self):
+        try:
+            # The Logstash image runs as uid 1000 / gid 1000
+            return aws.efs.AccessPoint(
+                f"{self.project_name}-logstash-efs-ap",
+                file_system_id=self.elasticsearch_file_system.id,
+                posix_user={"uid": 1000, "gid": 1000},
+                root_directory={
+                    "path": "/logstash",
+                    "creation_info": {"owner_uid": 1000, "owner_gid": 1000, "permissions": "750"},
+                },
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create logstash-efs-access-point: {str(e)}")
+
+    def elasticsearch_storage_settings(self):
+        # Task-definition arguments for the configured Elasticsearch storage
+        settings = {"ephemeral_storage": {"size_in_gib": self.es_storage["ephemeral_storage_gib"]}}
+        if self.es_storage["type"] == "efs":
+            settings["volumes"] = [{
+                "name": "elasticsearch-data",
+                "efs_volume_configuration": {
+                    "file_system_id": self.elasticsearch_file_system.id,
+                    "transit_encryption": "ENABLED",
+                    "authorization_config": {
+                        "access_point_id": self.elasticsearch_access_point.id,
+                        "iam": "DISABLED",
+                    },
+                },
+            }]
+        return settings
+
+    def elasticsearch_mount_points(self):
+        if self.es_storage["type"] != "efs":
+            return []
+        return [{"sourceVolume": "elasticsearch-data", "containerPath": ELASTICSEARCH_DATA_PATH}]
+
+    def create_elasticsearch_master_task(self, node_name):
+        try:
+            return aws.ecs.TaskDefinition(f"{self.project_name}-{node_name}-task",
+                family=f"elasticsearch-{node_name}",
+                network_mode="awsvpc",
+                container_definitions=pulumi.Output.json_dumps([{
+                    "name": "elasticsearch",
+                    "image": "docker.elastic.co/elasticsearch/elasticsearch:8.10.0",
+                    "memory": self.elasticsearch_master_size["memory"],
+                    "cpu": self.elasticsearch_master_size["cpu"],
+                    "entryPoint": ["/bin/sh", "-c"],
+                    "command": [ELASTICSEARCH_ENTRYPOINT],
+                    "mountPoints": self.elasticsearch_mount_points(),
+                    "environment": [
+                        {"name": "node.name", "value": node_name},
+                        {"name": "ES_NODE_DIR", "value": node_name},
+                        {"name": "ES_JAVA_OPTS", "value": sizing.java_opts(self.elasticsearch_master_size["heap_mb"])},
+                        *self.elasticsearch_environment("master"),
+                        *self.cluster_bootstrap_environment(),
+                    ],
+                    "portMappings": [{"containerPort": 9200}, {"containerPort": 9300}],
+                }]),
+                requires_compatibilities=["FARGATE"],
+                execution_role_arn=self.security.ecs_execution_role.arn,
+                task_role_arn=self.security.ecs_task_role.arn,
+                memory=str(self.elasticsearch_master_size["memory"]),
+                cpu=str(self.elasticsearch_master_size["cpu"]),
+                **self.elasticsearch_storage_settings(),
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create elasticsearch-master-task: {str(e)}")
+
+    def create_elasticsearch_master_service(self, node_name, task):
+        try:
+            # One service per master so each keeps its bootstrap node.name
+            return aws.ecs.Service(f"{self.project_name}-{node_name}-service",
+                cluster=self.compute.cluster.id,
+                task_definition=task.arn,
+                desired_count=1,
+                # The replacement needs this node's data directory and node lock,
+                # so stop the old task before starting the new one
+                deployment_maximum_percent=100,
+                deployment_minimum_healthy_percent=0,
+                capacity_provider_strategies=self.compute.capacity_strategy("elasticsearch"),
+                service_registries={"registry_arn": self.compute.discovery_services["elasticsearch-master"].arn},
+                network_configuration={
+                    "assign_public_ip": False,
+                    "subnets": self.network.private_subnet_ids,
+                    "security_groups": [self.security.ecs_security_group.id]
+                },
+                tags=self.common_tags,
+                opts=pulumi.ResourceOptions(depends_on=[self.compute.cluster_capacity_providers])
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create elasticsearch-master-service: {str(e)}")
+
+    def data_slots(self, name, desired_count):
+        # One slot per task the service can ever run at once
+        profile = self.autoscaling_profile(name)
+        scheduled = [schedule["max_capacity"] for schedule in self.scaling_schedules.get(name, [])]
+        return max(desired_count, profile["max_capacity"], *scheduled)
+
     def create_elasticsearch_task(self):
         try:
             return aws.ecs.TaskDefinition(f"{self.project_name}-elasticsearch-task",
@@ -34,19 +560,24 @@ class MonitoringStack:
                 container_definitions=pulumi.Output.json_dumps([{
                     "name": "elasticsearch",
                     "image": "docker.elastic.co/elasticsearch/elasticsearch:8.10.0",
-                    "memory": 1024,
-                    "cpu": 512,
+                    "memory": self.elasticsearch_size["memory"],
+                    "cpu": self.elasticsearch_size["cpu"],
+                    "entryPoint": ["/bin/sh", "-c"],
+                    "command": [ELASTICSEARCH_ENTRYPOINT],
+                    "mountPoints": self.elasticsearch_mount_points(),
                     "environment": [
-                        {"name": "discovery.type", "value": "single-node"},
-                        {"name": "xpack.security.enabled", "value": "false"}
+                        {"name": "ES_DATA_SLOTS", "value": str(self.data_slots("elasticsearch", self.es_topology["data_count"]))},
+                        {"name": "ES_JAVA_OPTS", "value": sizing.java_opts(self.elasticsearch_size["heap_mb"])},
+                        *self.elasticsearch_environment("data,ingest"),
                     ],
-                    "portMappings": [{"containerPort": 9200}],
+                    "portMappings": [{"containerPort": 9200}, {"containerPort": 9300}],
                 }]),
                 requires_compatibilities=["FARGATE"],
                 execution_role_arn=self.security.ecs_execution_role.arn,
                 task_role_arn=self.security.ecs_task_role.arn,
-                memory="2048",
-                cpu="1024",
+                memory=str(self.elasticsearch_size["memory"]),
+                cpu=str(self.elasticsearch_size["cpu"]),
+                **self.elasticsearch_storage_settings(),
                 tags=self.common_tags
             )
         except Exception as e:
@@ -57,8 +588,13 @@ class MonitoringStack:
             return aws.ecs.Service(f"{self.project_name}-elasticsearch-service",
                 cluster=self.compute.cluster.id,
                 task_definition=self.elasticsearch_task.arn,
-                desired_count=2,
-                launch_type="FARGATE",
+                desired_count=self.es_topology["data_count"],
+                # Replace half the nodes at a time without surging, so new tasks
+                # reclaim the slot directories the stopped tasks release
+                deployment_maximum_percent=100,
+                deployment_minimum_healthy_percent=50,
+                capacity_provider_strategies=self.compute.capacity_strategy("elasticsearch"),
+                service_registries={"registry_arn": self.compute.discovery_services["elasticsearch"].arn},
                 network_configuration={
                     "assign_public_ip": False,
                     "subnets": self.network.private_subnet_ids,
@@ -69,41 +605,189 @@ class MonitoringStack:
                 "container_name": "elasticsearch",
                 "container_port": 9200
             }],
-                tags=self.common_tags
+                tags=self.common_tags,
+                opts=pulumi.ResourceOptions(depends_on=[self.compute.cluster_capacity_providers, *self.elasticsearch_master_services])
             )
         except Exception as e:
             raise Exception(f"Failed to create elasticsearch-service: {str(e)}")
 
+    def create_ingest_stream(self):
+        try:
+            stream_settings = {"stream_mode_details": {"stream_mode": self.ingest_buffer["stream_mode"]}}
+            if self.ingest_buffer["stream_mode"] == "PROVISIONED":
+                stream_settings["shard_count"] = self.ingest_buffer["shard_count"]
+
+            return aws.kinesis.Stream(
+                f"{self.project_name}-log-ingest-stream",
+                name=self.ingest_stream_name,
+                retention_period=self.ingest_buffer["retention_hours"],
+                encryption_type="KMS",
+                kms_key_id=self.security.kms_key.arn,
+                shard_level_metrics=["IncomingRecords", "IteratorAgeMilliseconds"],
+                **stream_settings,
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create ingest-stream: {str(e)}")
+
+    def create_ingest_stream_policy(self):
+        try:
+            # The Kinesis input uses the KCL, which checkpoints to a DynamoDB
+            # table named after the application and publishes CloudWatch metrics
+            return aws.iam.RolePolicy(
+                f"{self.project_name}-ingest-stream-policy",
+                role=self.security.ecs_task_role.id,
+                policy=pulumi.Output.json_dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": [
+                                "kinesis:DescribeStream",
+                                "kinesis:DescribeStreamSummary",
+                                "kinesis:GetRecords",
+                                "kinesis:GetShardIterator",
+                                "kinesis:ListShards",
+                                "kinesis:PutRecord",
+                                "kinesis:PutRecords"
+                            ],
+                            "Resource": self.ingest_stream.arn
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": ["kms:Decrypt", "kms:GenerateDataKey"],
+                            "Resource": self.security.kms_key.arn
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": [
+                                "dynamodb:CreateTable",
+                                "dynamodb:DescribeTable",
+                                "dynamodb:GetItem",
+                                "dynamodb:PutItem",
+                                "dynamodb:UpdateItem",
+                                "dynamodb:DeleteItem",
+                                "dynamodb:Scan"
+                            ],
+                            "Resource": f"arn:aws:dynamodb:*:*:table/{self.ingest_stream_name}-logstash"
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": "cloudwatch:PutMetricData",
+                            "Resource": "*"
+                        }
+                    ]
+                })
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create ingest-stream-policy: {str(e)}")
+
+    def logstash_storage_settings(self):
+        if not self.logstash_durable_queue:
+            return {}
+        return {"volumes": [{
+            "name": "logstash-data",
+            "efs_volume_configuration": {
+                "file_system_id": self.elasticsearch_file_system.id,
+                "transit_encryption": "ENABLED",
+                "authorization_config": {
+                    "access_point_id": self.logstash_access_point.id,
+                    "iam": "DISABLED",
+                },
+            },
+        }]}
+
+    def logstash_container_settings(self):
+        # Entrypoint and mount that keep the persistent queue in a claimed EFS slot
+        if not self.logstash_durable_queue:
+            return {}
+        return {
+            "entryPoint": ["/bin/sh", "-c"],
+            "command": [LOGSTASH_DATA_SLOT_ENTRYPOINT],
+            "mountPoints": [{"sourceVolume": "logstash-data", "containerPath": LOGSTASH_DATA_PATH}],
+        }
+
+    def create_logstash_image(self):
+        try:
+            if self.logstash_image_override:
+                return self.logstash_image_override
+            if not self.ingest_buffer["enabled"]:
+                return LOGSTASH_IMAGE
+
+            repository = aws.ecr.Repository(
+                f"{self.project_name}-logstash-repo",
+                name=f"{self.project_name}-{self.environment}-logstash",
+                image_scanning_configuration={"scan_on_push": True},
+                encryption_configurations=[{"encryption_type": "KMS", "kms_key": self.security.kms_key.arn}],
+                tags=self.common_tags
+            )
+            aws.ecr.LifecyclePolicy(
+                f"{self.project_name}-logstash-repo-lifecycle",
+                repository=repository.name,
+                policy=pulumi.Output.json_dumps({
+                    "rules": [{
+                        "rulePriority": 1,
+                        "description": "Keep the last 10 images",
+                        "selection": {"tagStatus": "any", "countType": "imageCountMoreThan", "countNumber": 10},
+                        "action": {"type": "expire"},
+                    }]
+                })
+            )
+
+            credentials = aws.ecr.get_authorization_token_output(registry_id=repository.registry_id)
+            image = docker.Image(
+                f"{self.project_name}-logstash-image",
+                image_name=pulumi.Output.concat(repository.repository_url, ":", LOGSTASH_IMAGE.rsplit(":", 1)[1], "-kinesis"),
+                build=docker.DockerBuildArgs(
+                    context=LOGSTASH_KINESIS_IMAGE_CONTEXT,
+                    platform="linux/amd64",
+                    args={"LOGSTASH_VERSION": LOGSTASH_IMAGE.rsplit(":", 1)[1]},
+                ),
+                registry=docker.RegistryArgs(
+                    server=repository.repository_url,
+                    username=credentials.user_name,
+                    password=pulumi.Output.secret(credentials.password),
+                )
+            )
+            # Pin tasks to the pushed digest so a rebuild rolls the service
+            return image.repo_digest
+        except Exception as e:
+            raise Exception(f"Failed to create logstash-image: {str(e)}")
+
     def create_logstash_task(self):
         try:
 
             return aws.ecs.TaskDefinition(
                 f"{self.project_name}-logstash-task",
                 family="logstash",
-                cpu="256",
-                memory="512",
+                cpu=str(self.logstash_size["cpu"]),
+                memory=str(self.logstash_size["memory"]),
                 network_mode="awsvpc",
                 requires_compatibilities=["FARGATE"],
                 execution_role_arn=self.security.ecs_execution_role.arn,
                 task_role_arn=self.security.ecs_task_role.arn,
-                container_definitions=pulumi.Output.json_dumps([{
+                **self.logstash_storage_settings(),
+                container_definitions=pulumi.Output.json_dumps([
+                # Apply the ILM policy and index template before Logstash creates its
+                # data stream, so a fresh deploy never falls back to the built-in
+                # logs-*-* template. The Logstash image already ships curl.
+                {**self.index_bootstrap_container(self.logstash_image), "essential": False},
+                {
                 "name": "logstash",
-                "image": "docker.elastic.co/logstash/logstash:8.10.0",
-                "memory": 512,
-                "cpu": 256,
+                "image": self.logstash_image,
+                "memory": self.logstash_size["memory"],
+                "cpu": self.logstash_size["cpu"],
                 "essential": True,
+                # COMPLETE rather than SUCCESS: the container still waits for the
+                # cluster, but an optional request failing must not block ingest
+                "dependsOn": [{"containerName": "index-bootstrap", "condition": "COMPLETE"}],
+                **self.logstash_container_settings(),
                 "environment": [
-                    {"name": "LS_JAVA_OPTS", "value": "-Xmx256m -Xms256m"},
-                    {"name": "LOGSTASH_CONFIG_STRING", "value": """
-                    input { beats { port => 5044 } }
-                    filter { }
-                    output {
-                    elasticsearch {
-                        hosts => ["http://elasticsearch:9200"]
-                        index => "logstash-%{+YYYY.MM.dd}"
-                    }
-                    }
-                    """}],
+                    {"name": "LS_JAVA_OPTS", "value": sizing.java_opts(self.logstash_size["heap_mb"])},
+                    {"name": "LS_DATA_SLOTS", "value": str(self.data_slots("logstash", LOGSTASH_DESIRED_COUNT))},
+                    {"name": "ELASTICSEARCH_HOSTS", "value": self.compute.service_endpoint("elasticsearch", 9200)},
+                    *logstash.pipeline_environment(self.logstash_settings),
+                    {"name": "LOGSTASH_CONFIG_STRING", "value": logstash.render_pipeline(self.logstash_pipeline)}],
                     "portMappings": [{"containerPort": 5044}],
                 }]),
                 tags=self.common_tags
@@ -116,8 +800,12 @@ class MonitoringStack:
             return aws.ecs.Service(
                 f"{self.project_name}-logstash-service",
                 cluster=self.compute.cluster.id,
-                desired_count=2,
-                launch_type="FARGATE",
+                desired_count=LOGSTASH_DESIRED_COUNT,
+                # Stop tasks before replacing them so new tasks can claim their queue slots
+                deployment_maximum_percent=100,
+                deployment_minimum_healthy_percent=50,
+                capacity_provider_strategies=self.compute.capacity_strategy("logstash"),
+                service_registries={"registry_arn": self.compute.discovery_services["logstash"].arn},
                 task_definition=self.logstash_task.arn,
                 network_configuration={
                     "assign_public_ip": False,
@@ -129,11 +817,116 @@ class MonitoringStack:
                 "container_name": "logstash",
                 "container_port": 5044
             }],
-                tags=self.common_tags
+                tags=self.common_tags,
+                opts=pulumi.ResourceOptions(depends_on=[self.compute.cluster_capacity_providers])
             )
         except Exception as e:
             raise Exception(f"Failed to create logstash-service: {str(e)}")
 
+    def index_bootstrap_container(self, image):
+        # Idempotent PUTs of the snapshot repository, ILM policy and index template
+        policy_name = f"{self.project_name}-{self.index_lifecycle['data_stream_dataset']}"
+        snapshots = {**self.snapshots, "bucket": self.snapshot_bucket_name} if self.snapshots["enabled"] else None
+        requests = index_lifecycle.bootstrap_requests(self.index_lifecycle, policy_name, policy_name, snapshots)
+        return {
+            "name": "index-bootstrap",
+            "image": image,
+            "entryPoint": ["/bin/sh", "-c"],
+            "command": [index_lifecycle.bootstrap_script(len(requests))],
+            "environment": index_lifecycle.bootstrap_environment(
+                self.compute.service_endpoint("elasticsearch", 9200),
+                requests,
+            ),
+        }
+
+    def create_index_bootstrap_task(self):
+        try:
+            # Re-applies the templates on a schedule; Logstash tasks also run the
+            # same container before they start writing
+            return aws.ecs.TaskDefinition(f"{self.project_name}-index-bootstrap-task",
+                family="elasticsearch-index-bootstrap",
+                network_mode="awsvpc",
+                container_definitions=pulumi.Output.json_dumps([{
+                    **self.index_bootstrap_container("curlimages/curl:8.4.0"),
+                    "memory": 512,
+                    "cpu": 256,
+                    "essential": True,
+                }]),
+                requires_compatibilities=["FARGATE"],
+                execution_role_arn=self.security.ecs_execution_role.arn,
+                task_role_arn=self.security.ecs_task_role.arn,
+                memory="512",
+                cpu="256",
+                tags=self.common_tags
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create index-bootstrap-task: {str(e)}")
+
+    def create_index_bootstrap_schedule(self):
+        try:
+            # The bootstrap is idempotent, so re-running it on a schedule also
+            # applies template/policy changes after each deployment
+            role = aws.iam.Role(
+                f"{self.project_name}-index-bootstrap-events-role",
+                assume_role_policy=pulumi.Output.json_dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [{
+                        "Action": "sts:AssumeRole",
+                        "Effect": "Allow",
+                        "Principal": {"Service": "events.amazonaws.com"}
+                    }]
+                }),
+                tags=self.common_tags
+            )
+
+            aws.iam.RolePolicy(
+                f"{self.project_name}-index-bootstrap-events-policy",
+                role=role.id,
+                policy=pulumi.Output.json_dumps({
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": "ecs:RunTask",
+                            "Resource": self.index_bootstrap_task.arn
+                        },
+                        {
+                            "Effect": "Allow",
+                            "Action": "iam:PassRole",
+                            "Resource": [self.security.ecs_execution_role.arn, self.security.ecs_task_role.arn]
+                        }
+                    ]
+                })
+            )
+
+            rule = aws.cloudwatch.EventRule(
+                f"{self.project_name}-index-bootstrap-rule",
+                description="Apply Elasticsearch index templates and ILM policies",
+                schedule_expression=self.index_lifecycle["schedule"],
+                tags=self.common_tags
+            )
+
+            aws.cloudwatch.EventTarget(
+                f"{self.project_name}-index-bootstrap-target",
+                rule=rule.name,
+                arn=self.compute.cluster.arn,
+                role_arn=role.arn,
+                ecs_target={
+                    "task_definition_arn": self.index_bootstrap_task.arn,
+                    "task_count": 1,
+                    "launch_type": "FARGATE",
+                    "network_configuration": {
+                        "subnets": self.network.private_subnet_ids,
+                        "security_groups": [self.security.ecs_security_group.id],
+                        "assign_public_ip": False,
+                    },
+                }
+            )
+
+            return rule
+        except Exception as e:
+            raise Exception(f"Failed to create index-bootstrap-schedule: {str(e)}")
+
     def create_kibana_task(self):
         try:
             return aws.ecs.TaskDefinition(f"{self.project_name}-kibana-task",
@@ -142,18 +935,19 @@ class MonitoringStack:
                 container_definitions=pulumi.Output.json_dumps([{
                     "name": "kibana",
                     "image": "docker.elastic.co/kibana/kibana:8.10.0",
-                    "memory": 1024,
-                    "cpu": 512,
+                    "memory": self.kibana_size["memory"],
+                    "cpu": self.kibana_size["cpu"],
                     "environment": [
-                        {"name": "ELASTICSEARCH_HOSTS", "value": "http://elasticsearch:9200"}
+                        {"name": "ELASTICSEARCH_HOSTS", "value": self.compute.service_endpoint("elasticsearch", 9200)},
+                        {"name": "NODE_OPTIONS", "value": f"--max-old-space-size={self.kibana_size['heap_mb']}"}
                     ],
                     "portMappings": [{"containerPort": 5601}],
                 }]),
                 requires_compatibilities=["FARGATE"],
                 execution_role_arn=self.security.ecs_execution_role.arn,
                 task_role_arn=self.security.ecs_task_role.arn,
-                memory="2048",
-                cpu="1024",
+                memory=str(self.kibana_size["memory"]),
+                cpu=str(self.kibana_size["cpu"]),
                 tags=self.common_tags
             )
         except Exception as e:
@@ -165,7 +959,8 @@ class MonitoringStack:
                 cluster=self.compute.cluster.id,
                 task_definition=self.kibana_task.arn,
                 desired_count=1,
-                launch_type="FARGATE",
+                capacity_provider_strategies=self.compute.capacity_strategy("kibana"),
+                service_registries={"registry_arn": self.compute.discovery_services["kibana"].arn},
                 network_configuration={
                         "assign_public_ip": False,
                         "subnets": self.network.private_subnet_ids,
@@ -176,7 +971,8 @@ class MonitoringStack:
                     "container_name": "kibana",
                     "container_port": 5601
                 }],
-                tags=self.common_tags
+                tags=self.common_tags,
+                opts=pulumi.ResourceOptions(depends_on=[self.compute.cluster_capacity_providers])
                     
                 )
         except Exception as e:
@@ -184,55 +980,203 @@ class MonitoringStack:
         
 
 
+    def autoscaling_profile(self, name):
+        profile = {**DEFAULT_AUTOSCALING[name], **self.autoscaling_config.get(name, {})}
+        if name == "logstash" and self.ingest_buffer["enabled"] and "step_scaling" not in self.autoscaling_config.get(name, {}):
+            # Scale Logstash on stream backlog: the age of the oldest unread record
+            profile["step_scaling"] = [{
+                "name": "kinesis-backlog",
+                "namespace": "AWS/Kinesis",
+                "metric_name": "GetRecords.IteratorAgeMilliseconds",
+                "dimensions": {"StreamName": self.ingest_stream_name},
+                "statistic": "Maximum",
+                "threshold": 60000,
+                "steps": [
+                    {"lower": 0, "upper": 240000, "adjustment": 1},
+                    {"lower": 240000, "adjustment": 3},
+                ],
+                # Drained backlog: give back one task at a time
+                "scale_in": {"threshold": 5000, "adjustment": -1, "evaluation_periods": 10},
+            }]
+        return profile
+
     def create_auto_scaling(self, service, name: str):
         try:
+            profile = self.autoscaling_profile(name)
             target = aws.appautoscaling.Target(
                 f"{self.project_name}-{name}-AS-target",
-                max_capacity=5,
-                min_capacity=1,
+                max_capacity=profile["max_capacity"],
+                min_capacity=profile["min_capacity"],
                 resource_id=pulumi.Output.concat("service/", self.compute.cluster.name, "/", service.name),
                 scalable_dimension="ecs:service:DesiredCount",
                 service_namespace="ecs",
-                tags=self.common_tags
-                
+                tags=self.common_tags,
+                # Scheduled actions move min/max between windows; don't reset them on every update
+                opts=pulumi.ResourceOptions(ignore_changes=["min_capacity", "max_capacity"])
+                if self.scaling_schedules.get(name) else None
             )
+            cooldowns = {
+                "scale_in_cooldown": profile["scale_in_cooldown"],
+                "scale_out_cooldown": profile["scale_out_cooldown"],
+            }
 
             # CPU-based scaling
-            aws.appautoscaling.Policy(
-                f"{name}-app-cpu-scaling",
-                policy_type="TargetTrackingScaling",
-                resource_id=target.resource_id,
-                scalable_dimension=target.scalable_dimension,
-                service_namespace=target.service_namespace,
-                target_tracking_scaling_policy_configuration={
-                    "predefined_metric_specification": {
-                        "predefined_metric_type": "ECSServiceAverageCPUUtilization"
-                    },
-                    "target_value": 70.0,
-                    "scale_in_cooldown": 60,
-                    "scale_out_cooldown": 60
-                }
-            )
+            if profile.get("cpu_target"):
+                aws.appautoscaling.Policy(
+                    f"{name}-app-cpu-scaling",
+                    policy_type="TargetTrackingScaling",
+                    resource_id=target.resource_id,
+                    scalable_dimension=target.scalable_dimension,
+                    service_namespace=target.service_namespace,
+                    target_tracking_scaling_policy_configuration={
+                        "predefined_metric_specification": {
+                            "predefined_metric_type": "ECSServiceAverageCPUUtilization"
+                        },
+                        "target_value": float(profile["cpu_target"]),
+                        **cooldowns
+                    }
+                )
 
             # Memory-based scaling
-            aws.appautoscaling.Policy(
-                f"{name}-app-memory-scaling",
-                policy_type="TargetTrackingScaling",
-                resource_id=target.resource_id,
-                scalable_dimension=target.scalable_dimension,
-                service_namespace=target.service_namespace,
-                target_tracking_scaling_policy_configuration={
-                    "predefined_metric_specification": {
-                        "predefined_metric_type": "ECSServiceAverageMemoryUtilization"
-                    },
-                    "target_value": 80.0,
-                    "scale_in_cooldown": 100,
-                    "scale_out_cooldown": 100
-                }
-            )
+            if profile.get("memory_target"):
+                aws.appautoscaling.Policy(
+                    f"{name}-app-memory-scaling",
+                    policy_type="TargetTrackingScaling",
+                    resource_id=target.resource_id,
+                    scalable_dimension=target.scalable_dimension,
+                    service_namespace=target.service_namespace,
+                    target_tracking_scaling_policy_configuration={
+                        "predefined_metric_specification": {
+                            "predefined_metric_type": "ECSServiceAverageMemoryUtilization"
+                        },
+                        "target_value": float(profile["memory_target"]),
+                        **cooldowns
+                    }
+                )
+
+            # ALB request-based scaling (services behind the ALB only)
+            if profile.get("request_count_target"):
+                target_group = getattr(self.compute, f"{name}_tg")
+                aws.appautoscaling.Policy(
+                    f"{name}-app-request-scaling",
+                    policy_type="TargetTrackingScaling",
+                    resource_id=target.resource_id,
+                    scalable_dimension=target.scalable_dimension,
+                    service_namespace=target.service_namespace,
+                    target_tracking_scaling_policy_configuration={
+                        "predefined_metric_specification": {
+                            "predefined_metric_type": "ALBRequestCountPerTarget",
+                            "resource_label": pulumi.Output.concat(self.compute.alb.arn_suffix, "/", target_group.arn_suffix)
+                        },
+                        "target_value": float(profile["request_count_target"]),
+                        **cooldowns
+                    }
+                )
+
+            # Step scaling on custom CloudWatch metrics
+            for step in profile.get("step_scaling", []):
+                self.create_step_scaling(target, name, step, profile["scale_out_cooldown"])
+                if "scale_in" in step:
+                    self.create_step_scale_in(target, name, step, profile["scale_in_cooldown"])
+
+            return target
         except Exception as e:
             raise Exception(f"Failed to create auto-scaling: {str(e)}")
 
+    def create_scheduled_scaling(self, target, name: str):
+        try:
+            # Pre-warm capacity before known peaks and trim it overnight
+            actions = []
+            for window in self.scaling_schedules.get(name, []):
+                actions.append(aws.appautoscaling.ScheduledAction(
+                    f"{self.project_name}-{name}-{window['name']}-schedule",
+                    resource_id=target.resource_id,
+                    scalable_dimension=target.scalable_dimension,
+                    service_namespace=target.service_namespace,
+                    schedule=window["schedule"],
+                    timezone=window.get("timezone", "UTC"),
+                    scalable_target_action={
+                        "min_capacity": window["min_capacity"],
+                        "max_capacity": window["max_capacity"],
+                    }
+                ))
+            return actions
+        except Exception as e:
+            raise Exception(f"Failed to create scheduled-scaling: {str(e)}")
+
+    def create_step_scaling(self, target, name: str, step: Dict, cooldown: int):
+        # Step bounds are relative to the alarm threshold
+        policy = aws.appautoscaling.Policy(
+            f"{name}-app-{step['name']}-scaling",
+            policy_type="StepScaling",
+            resource_id=target.resource_id,
+            scalable_dimension=target.scalable_dimension,
+            service_namespace=target.service_namespace,
+            step_scaling_policy_configuration={
+                "adjustment_type": "ChangeInCapacity",
+                "cooldown": cooldown,
+                "metric_aggregation_type": step.get("statistic", "Average"),
+                "step_adjustments": [
+                    {
+                        "metric_interval_lower_bound": str(adjustment["lower"]),
+                        **({"metric_interval_upper_bound": str(adjustment["upper"])} if "upper" in adjustment else {}),
+                        "scaling_adjustment": adjustment["adjustment"],
+                    }
+                    for adjustment in step["steps"]
+                ],
+            }
+        )
+
+        aws.cloudwatch.MetricAlarm(
+            f"{self.project_name}-{name}-{step['name']}-alarm",
+            namespace=step["namespace"],
+            metric_name=step["metric_name"],
+            dimensions=step.get("dimensions", {}),
+            statistic=step.get("statistic", "Average"),
+            period=step.get("period", 60),
+            evaluation_periods=step.get("evaluation_periods", 2),
+            threshold=step["threshold"],
+            comparison_operator="GreaterThanOrEqualToThreshold",
+            alarm_actions=[policy.arn],
+            tags=self.common_tags
+        )
+        return policy
+
+    def create_step_scale_in(self, target, name: str, step: Dict, cooldown: int):
+        # Mirror of the scale-out policy, fired while the metric stays below its own threshold
+        scale_in = step["scale_in"]
+        policy = aws.appautoscaling.Policy(
+            f"{name}-app-{step['name']}-scale-in",
+            policy_type="StepScaling",
+            resource_id=target.resource_id,
+            scalable_dimension=target.scalable_dimension,
+            service_namespace=target.service_namespace,
+            step_scaling_policy_configuration={
+                "adjustment_type": "ChangeInCapacity",
+                "cooldown": cooldown,
+                "metric_aggregation_type": step.get("statistic", "Average"),
+                "step_adjustments": [{
+                    "metric_interval_upper_bound": "0",
+                    "scaling_adjustment": scale_in.get("adjustment", -1),
+                }],
+            }
+        )
+
+        aws.cloudwatch.MetricAlarm(
+            f"{self.project_name}-{name}-{step['name']}-scale-in-alarm",
+            namespace=step["namespace"],
+            metric_name=step["metric_name"],
+            dimensions=step.get("dimensions", {}),
+            statistic=step.get("statistic", "Average"),
+            period=step.get("period", 60),
+            evaluation_periods=scale_in.get("evaluation_periods", step.get("evaluation_periods", 2)),
+            threshold=scale_in["threshold"],
+            comparison_operator="LessThanThreshold",
+            alarm_actions=[policy.arn],
+            tags=self.common_tags
+        )
+        return policy
+
 
 
    
@@ -1,12 +1,40 @@
 import pulumi
 import pulumi_aws as aws
 from typing import Dict
+from infrastructure import invokes
+from infrastructure.cidr import plan_subnets
+
+# Endpoint type for each AWS service the private subnets talk to
+VPC_ENDPOINT_CATALOG = {
+    "s3": "Gateway",
+    "dynamodb": "Gateway",
+    "ecr.api": "Interface",
+    "ecr.dkr": "Interface",
+    "logs": "Interface",
+    "secretsmanager": "Interface",
+    "kms": "Interface",
+    "sts": "Interface",
+    "ecs": "Interface",
+    "ecs-agent": "Interface",
+    "ecs-telemetry": "Interface",
+}
 
 class NetworkStack:
     def __init__(self, project_name: str, environment: str, common_tags: Dict[str, str]):
         self.project_name = project_name
         self.environment = environment
         self.common_tags = common_tags
+
+        # Network configuration
+        config = pulumi.Config("network")
+        self.az_count = config.get_int("az_count") or 2
+        self.nat_mode = config.get("nat_mode") or "single"
+        self.vpc_cidr = config.get("vpc_cidr") or "10.0.0.0/16"
+        self.max_azs = config.get_int("max_azs") or 4
+        self.subnet_hosts = config.get_object("subnet_hosts") or {"public": 250, "private": 4000}
+        self.vpc_endpoint_config = config.get_object("vpc_endpoints") or list(VPC_ENDPOINT_CATALOG)
+        if self.nat_mode not in ("single", "per-az"):
+            raise Exception(f"Invalid network:nat_mode '{self.nat_mode}', expected 'single' or 'per-az'")
         
         # Create VPC
         self.vpc = self.create_vpc()
@@ -15,6 +43,11 @@ class NetworkStack:
         self.igw = self.create_internet_gateway()
         
         # Create subnets
+        self.azs = self.get_azs()
+        self.subnet_plan = plan_subnets(self.vpc_cidr, self.subnet_hosts, len(self.azs), self.max_azs)
+        for tier in set(self.subnet_plan) - {"public", "private"}:
+            # Extra tiers only reserve address space; every workload still uses the private tier
+            pulumi.log.warn(f"network:subnet_hosts tier '{tier}' only reserves CIDR space, no subnets are created for it")
         self.public_subnets = self.create_public_subnets()
         self.private_subnets = self.create_private_subnets()
 
@@ -24,7 +57,7 @@ class NetworkStack:
         
         # Create route tables
         self.public_route_table = self.create_public_route_table()
-        self.private_route_table = self.create_private_route_table()
+        self.private_route_tables = self.create_private_route_tables()
         
         # Create Security Groups
         self.vpc_endpoint_security_group = self.create_vpc_endpoint_security_group()
@@ -37,7 +70,7 @@ class NetworkStack:
         try:
             return aws.ec2.Vpc(
                 f"{self.project_name}-vpc",
-                cidr_block="10.0.0.0/16",
+                cidr_block=self.vpc_cidr,
                 enable_dns_hostnames=True,
                 enable_dns_support=True,
                 tags={
@@ -62,16 +95,21 @@ class NetworkStack:
         except Exception as e:
             raise Exception(f"Failed to create IGW: {str(e)}")
 
+    def get_azs(self):
+        azs = invokes.get_availability_zones(state="available").names
+        if self.az_count < 1 or self.az_count > len(azs):
+            raise Exception(f"network:az_count must be between 1 and {len(azs)}, got {self.az_count}")
+        return azs[:self.az_count]
+
     def create_public_subnets(self):
         try:
-            azs = aws.get_availability_zones(state="available").names
             public_subnets = []
         
-            for i, az in enumerate(azs[:2]):
+            for i, az in enumerate(self.azs):
                 subnet = aws.ec2.Subnet(
                     f"{self.project_name}-public-{az}",
                     vpc_id=self.vpc.id,
-                    cidr_block=f"10.0.{i*2}.0/24",
+                    cidr_block=self.subnet_plan["public"][i],
                     availability_zone=az,
                     map_public_ip_on_launch=True,
                     tags={
@@ -90,14 +128,13 @@ class NetworkStack:
 
     def create_private_subnets(self):
         try:
-            azs = aws.get_availability_zones(state="available").names
             private_subnets = []
             
-            for i, az in enumerate(azs[:2]):
+            for i, az in enumerate(self.azs):
                 subnet = aws.ec2.Subnet(
                     f"{self.project_name}-private-{az}",
                     vpc_id=self.vpc.id,
-                    cidr_block=f"10.0.{i*2+1}.0/24",
+                    cidr_block=self.subnet_plan["private"][i],
                     availability_zone=az,
                     tags={
                         **self.common_tags,
@@ -114,26 +151,36 @@ class NetworkStack:
 
     def create_nat_gateways(self):
         try:
-            eip = aws.ec2.Eip(
-                f"{self.project_name}-nat-eip",
-                domain="vpc",
-                tags={
-                    **self.common_tags,
-                    'Name': f"{self.project_name}-nat-eip"
-                }
-            )
-            
-            nat_gateway = aws.ec2.NatGateway(
-                f"{self.project_name}-nat",
-                allocation_id=eip.id,
-                subnet_id=self.public_subnets[0].id,  
-                tags={
-                    **self.common_tags,
-                    'Name': f"{self.project_name}-nat"
-                }
-            )
+            # In "single" mode one NAT in the first public subnet serves every AZ;
+            # "per-az" places a NAT in each public subnet so egress stays in-zone.
+            if self.nat_mode == "single":
+                placements = [("", self.public_subnets[0])]
+            else:
+                placements = [(f"-{az}", subnet) for az, subnet in zip(self.azs, self.public_subnets)]
+
+            nat_gateways = []
+            for suffix, subnet in placements:
+                eip = aws.ec2.Eip(
+                    f"{self.project_name}-nat-eip{suffix}",
+                    domain="vpc",
+                    tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-nat-eip{suffix}"
+                    }
+                )
+                
+                nat_gateway = aws.ec2.NatGateway(
+                    f"{self.project_name}-nat{suffix}",
+                    allocation_id=eip.id,
+                    subnet_id=subnet.id,  
+                    tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-nat{suffix}"
+                    }
+                )
+                nat_gateways.append(nat_gateway)
             
-            return nat_gateway
+            return nat_gateways
         except Exception as e:
             raise Exception(f"Failed to create NAT: {str(e)}")
     
@@ -167,32 +214,47 @@ class NetworkStack:
             raise Exception(f"Failed to create PublicRouteTable: {str(e)}")
     
 
-    def create_private_route_table(self):
+    def create_private_route_tables(self):
         try:
-            route_table = aws.ec2.RouteTable(
-                f"{self.project_name}-private-rt",
-                vpc_id=self.vpc.id,
-                routes=[
-                    {
-                        "cidr_block": "0.0.0.0/0",
-                        "nat_gateway_id": self.nat_gateways.id,
+            # One shared route table in "single" mode, one per AZ pointing at
+            # that AZ's NAT in "per-az" mode.
+            if self.nat_mode == "single":
+                groups = [("", self.nat_gateways[0], self.private_subnets)]
+            else:
+                groups = [
+                    (f"-{az}", nat_gateway, [private_subnet])
+                    for az, nat_gateway, private_subnet in zip(self.azs, self.nat_gateways, self.private_subnets)
+                ]
+
+            route_tables = []
+            assoc_index = 0
+            for suffix, nat_gateway, subnets in groups:
+                route_table = aws.ec2.RouteTable(
+                    f"{self.project_name}-private-rt{suffix}",
+                    vpc_id=self.vpc.id,
+                    routes=[
+                        {
+                            "cidr_block": "0.0.0.0/0",
+                            "nat_gateway_id": nat_gateway.id,
+                        }
+                    ],
+                    tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-private-rt{suffix}"
                     }
-                ],
-                tags={
-                    **self.common_tags,
-                    'Name': f"{self.project_name}-private-rt"
-                }
-            )
-            
-            # Associate the route table with all private subnets
-            for i,  private_subnet in enumerate(self.private_subnets):
-                aws.ec2.RouteTableAssociation(
-                    f"{self.project_name}-private-rt-assoc-{i}",
-                    subnet_id=private_subnet.id,
-                    route_table_id=route_table.id
                 )
+                
+                # Associate the route table with its private subnets
+                for private_subnet in subnets:
+                    aws.ec2.RouteTableAssociation(
+                        f"{self.project_name}-private-rt-assoc-{assoc_index}",
+                        subnet_id=private_subnet.id,
+                        route_table_id=route_table.id
+                    )
+                    assoc_index += 1
+                route_tables.append(route_table)
             
-            return route_table
+            return route_tables
         except Exception as e:
             raise Exception(f"Failed to create PrivateRouteTable: {str(e)}")
 
@@ -224,40 +286,67 @@ class NetworkStack:
     def create_vpc_endpoints(self):
         try:
             endpoints = {}
+            region = invokes.get_region().name
             
-            # S3 Gateway Endpoint
-            endpoints['s3'] = aws.ec2.VpcEndpoint(
-                f"{self.project_name}-s3-endpoint",
-                vpc_id=self.vpc.id,
-                service_name=f"com.amazonaws.{aws.get_region().name}.s3",
-                vpc_endpoint_type="Gateway",
-                route_table_ids=[self.private_route_table.id],
-                tags={
-                    **self.common_tags,
-                    'Name': f"{self.project_name}-s3-endpoint"
-                }
-            )
-            
-            # ECR Interface Endpoints
-            for service in ['ecr.api', 'ecr.dkr']:
-                endpoints[service] = aws.ec2.VpcEndpoint(
-                    f"{self.project_name}-{service}-endpoint",
-                    vpc_id=self.vpc.id,
-                    service_name=f"com.amazonaws.{aws.get_region().name}.{service}",
-                    vpc_endpoint_type="Interface",
-                    subnet_ids=[subnet.id for subnet in self.private_subnets],
-                    security_group_ids=[self.vpc_endpoint_security_group.id],
-                    private_dns_enabled=True,
-                    tags={
-                        **self.common_tags,
-                        'Name': f"{self.project_name}-{service}-endpoint"
-                    }
-                )
+            for spec in self.endpoint_specs():
+                service = spec["service"]
+                if spec["type"] == "Gateway":
+                    # Gateway endpoints are attached to route tables
+                    route_tables = []
+                    if "private" in spec["route_tables"]:
+                        route_tables += self.private_route_tables
+                    if "public" in spec["route_tables"]:
+                        route_tables.append(self.public_route_table)
+                    endpoints[service] = aws.ec2.VpcEndpoint(
+                        f"{self.project_name}-{service}-endpoint",
+                        vpc_id=self.vpc.id,
+                        service_name=f"com.amazonaws.{region}.{service}",
+                        vpc_endpoint_type="Gateway",
+                        route_table_ids=[route_table.id for route_table in route_tables],
+                        tags={
+                            **self.common_tags,
+                            'Name': f"{self.project_name}-{service}-endpoint"
+                        }
+                    )
+                else:
+                    # Interface endpoints get an ENI in each private subnet
+                    endpoints[service] = aws.ec2.VpcEndpoint(
+                        f"{self.project_name}-{service}-endpoint",
+                        vpc_id=self.vpc.id,
+                        service_name=f"com.amazonaws.{region}.{service}",
+                        vpc_endpoint_type="Interface",
+                        subnet_ids=[subnet.id for subnet in self.private_subnets],
+                        security_group_ids=[self.vpc_endpoint_security_group.id],
+                        private_dns_enabled=spec["private_dns"],
+                        tags={
+                            **self.common_tags,
+                            'Name': f"{self.project_name}-{service}-endpoint"
+                        }
+                    )
             
             return endpoints
         except Exception as e:
             raise Exception(f"Failed to create VPCEndpoints {str(e)}")
 
+    def endpoint_specs(self):
+        # Entries in network:vpc_endpoints are either a catalog service name or
+        # an object overriding the catalog defaults for that service.
+        specs = []
+        for entry in self.vpc_endpoint_config:
+            if isinstance(entry, str):
+                entry = {"service": entry}
+            service = entry["service"]
+            if service not in VPC_ENDPOINT_CATALOG and "type" not in entry:
+                raise Exception(f"Unknown VPC endpoint service '{service}', set its type explicitly")
+            specs.append({
+                "service": service,
+                "type": VPC_ENDPOINT_CATALOG.get(service),
+                "route_tables": ["private"],
+                "private_dns": True,
+                **entry,
+            })
+        return specs
+
     @property
     def private_subnet_ids(self):
         return [subnet.id for subnet in self.private_subnets]
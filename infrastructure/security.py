@@ -3,6 +3,7 @@ import pulumi_aws as aws
 from typing import Dict
 import json
 import pulumi_random as random
+from infrastructure import invokes
 
 
 class SecurityStack:
@@ -12,6 +13,10 @@ class SecurityStack:
         self.environment = environment
         self.common_tags = common_tags
         self.domain = domain
+
+        # Security configuration
+        config = pulumi.Config("security")
+        self.enable_ssl = config.get_bool("enable_ssl") or False
         
         # Create KMS keys
         self.kms_key = self.create_kms_key()
@@ -19,7 +24,10 @@ class SecurityStack:
         # Create security groups
         self.alb_security_group = self.create_alb_security_group()
         self.ecs_security_group = self.create_ecs_security_group()
+        self.rds_proxy_security_group = self.create_rds_proxy_security_group()
         self.rds_security_group = self.create_rds_security_group()
+        self.efs_security_group = self.create_efs_security_group()
+        self.redis_security_group = self.create_redis_security_group()
         # self.es_security_group = self.create_elasticsearch_security_group()
         
         # Create IAM roles
@@ -27,7 +35,7 @@ class SecurityStack:
         self.ecs_execution_role = self.create_ecs_execution_role()
         
         # Create SSL certificate
-        # self.ssl_certificate = self.create_ssl_certificate()
+        self.ssl_certificate = self.create_ssl_certificate() if self.enable_ssl else None
         
         # Create secrets
         self.db_secret = self.create_db_secret()
@@ -40,7 +48,7 @@ class SecurityStack:
                     "Sid": "Enable IAM User Permissions",
                     "Effect": "Allow",
                     "Principal": {
-                        "AWS": f"arn:aws:iam::{aws.get_caller_identity().account_id}:root"
+                        "AWS": f"arn:aws:iam::{invokes.get_caller_identity().account_id}:root"
                     },
                     "Action": "kms:*",
                     "Resource": "*"
@@ -118,6 +126,14 @@ class SecurityStack:
                         "cidr_blocks": ["0.0.0.0/0"],
                         "description": "Allow Elasticsearch port"
                     },
+                    # Allow Elasticsearch node-to-node transport between tasks
+                    {
+                        "protocol": "tcp",
+                        "from_port": 9300,
+                        "to_port": 9300,
+                        "self": True,
+                        "description": "Allow Elasticsearch transport port"
+                    },
                     # Allow traffic on port 5601 for Kibana
                     {
                         "protocol": "tcp",
@@ -166,6 +182,34 @@ class SecurityStack:
         except Exception as e:
             raise Exception(f"Failed to create ECS-SG: {str(e)}")
 
+    def create_rds_proxy_security_group(self):
+        try:
+            return aws.ec2.SecurityGroup(
+                f"{self.project_name}-rds-proxy-sg",
+                vpc_id=self.network.vpc.id,
+                description="Security group for RDS Proxy",
+                ingress=[{
+                    "protocol": "tcp",
+                    "from_port": 5432,
+                    "to_port": 5432,
+                    "security_groups": [self.ecs_security_group.id],
+                    "description": "Allow PostgreSQL access from ECS tasks"
+                }],
+                egress=[{
+                    "protocol": "tcp",
+                    "from_port": 0,
+                    "to_port": 65535,
+                    "cidr_blocks": [self.network.vpc.cidr_block],
+                    "description": "Allow proxy to reach the database and Secrets Manager endpoint"
+                }],
+                tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-rds-proxy-sg"
+                    }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create RDS-proxy-SG: {str(e)}")
+
     def create_rds_security_group(self):
         try:
             return aws.ec2.SecurityGroup(
@@ -176,8 +220,8 @@ class SecurityStack:
                     "protocol": "tcp",
                     "from_port": 5432,
                     "to_port": 5432,
-                    "security_groups": [self.ecs_security_group.id],
-                    "description": "Allow PostgreSQL access from ECS tasks"
+                    "security_groups": [self.ecs_security_group.id, self.rds_proxy_security_group.id],
+                    "description": "Allow PostgreSQL access from ECS tasks and RDS Proxy"
                 }],
                 tags={
                         **self.common_tags,
@@ -187,6 +231,48 @@ class SecurityStack:
         except Exception as e:
             raise Exception(f"Failed to create RDS-SG: {str(e)}")
 
+    def create_redis_security_group(self):
+        try:
+            return aws.ec2.SecurityGroup(
+                f"{self.project_name}-redis-sg",
+                vpc_id=self.network.vpc.id,
+                description="Security group for ElastiCache Redis",
+                ingress=[{
+                    "protocol": "tcp",
+                    "from_port": 6379,
+                    "to_port": 6379,
+                    "security_groups": [self.ecs_security_group.id],
+                    "description": "Allow Redis access from ECS tasks"
+                }],
+                tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-redis-sg"
+                    }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create Redis-SG: {str(e)}")
+
+    def create_efs_security_group(self):
+        try:
+            return aws.ec2.SecurityGroup(
+                f"{self.project_name}-efs-sg",
+                vpc_id=self.network.vpc.id,
+                description="Security group for EFS mount targets",
+                ingress=[{
+                    "protocol": "tcp",
+                    "from_port": 2049,
+                    "to_port": 2049,
+                    "security_groups": [self.ecs_security_group.id],
+                    "description": "Allow NFS access from ECS tasks"
+                }],
+                tags={
+                        **self.common_tags,
+                        'Name': f"{self.project_name}-efs-sg"
+                    }
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create EFS-SG: {str(e)}")
+
 
     def create_ecs_task_role(self):
         try:
@@ -253,23 +339,24 @@ class SecurityStack:
         except Exception as e:
             raise Exception(f"Failed to create ECS-execution-role: {str(e)}")
 
-    # def create_ssl_certificate(self):
-
+    def create_ssl_certificate(self):
+        try:
+            # DNS validation records are managed outside this project; the
+            # validation resource waits until ACM reports the certificate issued.
+            certificate = aws.acm.Certificate(
+                f"{self.project_name}-ssl-cert",
+                domain_name=self.domain,
+                validation_method="DNS",
+                opts=pulumi.ResourceOptions(ignore_changes=["domain_validation_options"]),
+                tags=self.common_tags
+            )
 
-    #     try:
-    #         # For development, you might want to use a self-signed certificate
-    #         # For production, you should use AWS Certificate Manager with a valid domain
-    #         certificate = aws.acm.Certificate(
-    #             f"{self.project_name}-ssl-cert",
-    #             domain_name=self.domain,
-    #             validation_method="DNS",
-    #             opts=pulumi.ResourceOptions(ignore_changes=["domain_validation_options"]),
-    #             tags=self.common_tags
-    #         )
-            
-    #         return certificate
-    #     except Exception as e:
-    #         raise Exception(f"Failed to create SSL-cert: {str(e)}")
+            return aws.acm.CertificateValidation(
+                f"{self.project_name}-ssl-cert-validation",
+                certificate_arn=certificate.arn,
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create SSL-cert: {str(e)}")
     
 
     def create_db_secret(self):
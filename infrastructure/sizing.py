@@ -0,0 +1,68 @@
+from typing import Dict
+
+# Valid Fargate memory values (MiB) for each CPU size (units)
+FARGATE_SIZES = {
+    256: (512, 1024, 2048),
+    512: tuple(range(1024, 4096 + 1, 1024)),
+    1024: tuple(range(2048, 8192 + 1, 1024)),
+    2048: tuple(range(4096, 16384 + 1, 1024)),
+    4096: tuple(range(8192, 30720 + 1, 1024)),
+    8192: tuple(range(16384, 61440 + 1, 4096)),
+    16384: tuple(range(32768, 122880 + 1, 8192)),
+}
+
+# Keep JVM heaps under ~32 GB so the JVM can still use compressed oops
+COMPRESSED_OOPS_HEAP_MB = 31744
+LOGSTASH_MAX_HEAP_MB = 8192
+KIBANA_MAX_HEAP_MB = 4096
+
+
+def validate_fargate_size(cpu: int, memory: int):
+    if cpu not in FARGATE_SIZES:
+        raise ValueError(f"Unsupported Fargate CPU size {cpu}, expected one of {sorted(FARGATE_SIZES)}")
+    allowed = FARGATE_SIZES[cpu]
+    if memory not in allowed:
+        raise ValueError(
+            f"Memory {memory} MiB is not valid with {cpu} CPU units on Fargate "
+            f"({allowed[0]}-{allowed[-1]}, allowed: {', '.join(map(str, allowed))})"
+        )
+
+
+def _heap(memory: int, ratio: float, cap: int) -> int:
+    return min(int(memory * ratio), cap)
+
+
+def elasticsearch_sizing(cpu: int, memory: int) -> Dict[str, int]:
+    """Container limits and JVM heap (half the task memory) for an Elasticsearch task."""
+    validate_fargate_size(cpu, memory)
+    return {
+        "cpu": cpu,
+        "memory": memory,
+        "heap_mb": _heap(memory, 0.5, COMPRESSED_OOPS_HEAP_MB),
+    }
+
+
+def logstash_sizing(cpu: int, memory: int) -> Dict[str, int]:
+    """Container limits, JVM heap and one pipeline worker per vCPU for a Logstash task."""
+    validate_fargate_size(cpu, memory)
+    return {
+        "cpu": cpu,
+        "memory": memory,
+        "heap_mb": _heap(memory, 0.5, LOGSTASH_MAX_HEAP_MB),
+        "pipeline_workers": max(1, cpu // 1024),
+    }
+
+
+def kibana_sizing(cpu: int, memory: int) -> Dict[str, int]:
+    """Container limits and Node.js old-space limit for a Kibana task."""
+    validate_fargate_size(cpu, memory)
+    return {
+        "cpu": cpu,
+        "memory": memory,
+        "heap_mb": _heap(memory, 0.5, KIBANA_MAX_HEAP_MB),
+    }
+
+
+def java_opts(heap_mb: int) -> str:
+    # Equal min and max heap avoids resize pauses
+    return f"-Xms{heap_mb}m -Xmx{heap_mb}m"
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+# Invoke results returned by the mocks, keyed by provider function token
+INVOKE_RESULTS = {
+    "aws:index/getAvailabilityZones:getAvailabilityZones": {
+        "names": ["us-east-1a", "us-east-1b", "us-east-1c"],
+        "zoneIds": ["use1-az1", "use1-az2", "use1-az4"],
+    },
+    "aws:index/getRegion:getRegion": {"name": "us-east-1", "region": "us-east-1", "id": "us-east-1"},
+    "aws:index/getCallerIdentity:getCallerIdentity": {
+        "accountId": "123456789012",
+        "arn": "arn:aws:iam::123456789012:user/test",
+        "userId": "test",
+    },
+}
+
+
+# Provider-computed outputs that the stacks read back from resources
+COMPUTED_OUTPUTS = {
+    "aws:ecr/repository:Repository": lambda name: {
+        "repositoryUrl": f"123456789012.dkr.ecr.us-east-1.amazonaws.com/{name}",
+        "registryId": "123456789012",
+    },
+    "docker:index/image:Image": lambda name: {"repoDigest": f"{name}@sha256:0123"},
+    "aws:lb/loadBalancer:LoadBalancer": lambda name: {"arnSuffix": f"app/{name}/0123", "dnsName": f"{name}.elb.amazonaws.com"},
+    "aws:lb/targetGroup:TargetGroup": lambda name: {"arnSuffix": f"targetgroup/{name}/0123"},
+}
+
+
+@pytest.fixture
+def pulumi_mocks():
+    """Route resource registrations and invokes to in-memory mocks.
+
+    The fixture records every registered resource so tests can assert on the
+    set a stack creates. Config is set per test with `mocks.set_config()`.
+    """
+    pulumi = pytest.importorskip("pulumi")
+    pytest.importorskip("pulumi_aws")
+    from infrastructure import invokes
+
+    class Mocks(pulumi.runtime.Mocks):
+        def __init__(self):
+            self.resources = []
+
+        def new_resource(self, args):
+            self.resources.append(args)
+            outputs = {
+                # Providers auto-name resources that are created without a name
+                "name": args.name,
+                **args.inputs,
+                "arn": f"arn:aws:mock:us-east-1:123456789012:{args.name}",
+                **COMPUTED_OUTPUTS.get(args.typ, lambda name: {})(args.name),
+            }
+            return [f"{args.name}-id", outputs]
+
+        def call(self, args):
+            if args.token == "aws:ecr/getAuthorizationToken:getAuthorizationToken":
+                return {"userName": "AWS", "password": "token"}
+            return INVOKE_RESULTS.get(args.token, {})
+
+        def set_config(self, values):
+            # Objects are stored as JSON, the same way `pulumi config set --path` does
+            pulumi.runtime.set_all_config({
+                key: value if isinstance(value, str) else json.dumps(value)
+                for key, value in values.items()
+            })
+
+        def of_type(self, typ):
+            return [resource for resource in self.resources if resource.typ == typ]
+
+    mocks = Mocks()
+    pulumi.runtime.set_mocks(mocks, project="numeris-book", stack="test", preview=False)
+    mocks.set_config({})
+    invokes.invalidate()
+    yield mocks
+    invokes.invalidate()
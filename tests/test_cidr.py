@@ -0,0 +1,80 @@
+import ipaddress
+from itertools import combinations
+
+import pytest
+
+from infrastructure.cidr import plan_subnets, prefix_for_hosts
+
+TIERS = {"public": 250, "private": 4000, "data": 500, "endpoints": 50}
+
+
+def all_subnets(plan):
+    return [ipaddress.ip_network(cidr) for subnets in plan.values() for cidr in subnets]
+
+
+def test_prefix_for_hosts_accounts_for_reserved_addresses():
+    assert prefix_for_hosts(250) == 24
+    assert prefix_for_hosts(252) == 23
+    assert prefix_for_hosts(4000) == 20
+    assert prefix_for_hosts(1) == 28
+
+
+def test_subnets_do_not_overlap():
+    plan = plan_subnets("10.0.0.0/16", TIERS, az_count=4)
+    subnets = all_subnets(plan)
+
+    assert len(subnets) == 16
+    for a, b in combinations(subnets, 2):
+        assert not a.overlaps(b), f"{a} overlaps {b}"
+
+
+def test_subnets_stay_inside_the_vpc():
+    vpc = ipaddress.ip_network("10.0.0.0/16")
+    for subnet in all_subnets(plan_subnets(str(vpc), TIERS, az_count=4)):
+        assert subnet.subnet_of(vpc)
+
+
+def test_adding_an_az_keeps_existing_slots():
+    two = plan_subnets("10.0.0.0/16", TIERS, az_count=2)
+    three = plan_subnets("10.0.0.0/16", TIERS, az_count=3)
+
+    for tier in TIERS:
+        assert three[tier][:2] == two[tier]
+        assert len(three[tier]) == 3
+
+
+def test_default_layout():
+    plan = plan_subnets("10.0.0.0/16", {"public": 250, "private": 4000}, az_count=2)
+
+    assert plan == {
+        "public": ["10.0.64.0/24", "10.0.65.0/24"],
+        "private": ["10.0.0.0/20", "10.0.16.0/20"],
+    }
+
+
+def test_changing_max_azs_moves_tiers():
+    four = plan_subnets("10.0.0.0/16", {"public": 250, "private": 4000}, az_count=2, max_azs=4)
+    five = plan_subnets("10.0.0.0/16", {"public": 250, "private": 4000}, az_count=2, max_azs=5)
+
+    assert four["public"][0] == "10.0.64.0/24"
+    assert five["public"][0] == "10.0.128.0/24"
+
+
+def test_oversized_tier_is_rejected():
+    with pytest.raises(ValueError, match="larger than VPC"):
+        plan_subnets("10.0.0.0/20", {"private": 4000}, az_count=2)
+
+
+def test_tiers_that_do_not_fit_together_are_rejected():
+    with pytest.raises(ValueError, match="too small"):
+        plan_subnets("10.0.0.0/16", {"private": 4000, "data": 4000, "public": 4000, "other": 4000, "extra": 250}, az_count=2)
+
+
+def test_az_count_above_max_azs_is_rejected():
+    with pytest.raises(ValueError, match="az_count"):
+        plan_subnets("10.0.0.0/16", TIERS, az_count=5, max_azs=4)
+
+
+def test_zero_hosts_is_rejected():
+    with pytest.raises(ValueError):
+        prefix_for_hosts(0)
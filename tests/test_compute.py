@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("pulumi")
+
+from infrastructure.compute import ComputeStack, TARGET_GROUP_PROFILES
+
+
+def profile_for(name, overrides=None):
+    stack = ComputeStack.__new__(ComputeStack)
+    stack.target_group_config = {name: overrides} if overrides else {}
+    return stack.target_group_profile(name)
+
+
+@pytest.mark.parametrize("name", sorted(TARGET_GROUP_PROFILES))
+def test_builtin_profiles_are_valid(name):
+    profile = profile_for(name)
+    assert not (profile["slow_start"] and profile["load_balancing_algorithm_type"] == "least_outstanding_requests")
+
+
+def test_overrides_replace_profile_keys():
+    profile = profile_for("kibana", {"deregistration_delay": 10})
+
+    assert profile["deregistration_delay"] == 10
+    assert profile["health_path"] == "/api/status"
+
+
+def test_least_outstanding_requests_without_slow_start_is_allowed():
+    profile = profile_for("elasticsearch", {"slow_start": 0, "load_balancing_algorithm_type": "least_outstanding_requests"})
+
+    assert profile["load_balancing_algorithm_type"] == "least_outstanding_requests"
+
+
+def test_slow_start_with_least_outstanding_requests_is_rejected():
+    with pytest.raises(Exception, match="slow_start"):
+        profile_for("elasticsearch", {"load_balancing_algorithm_type": "least_outstanding_requests"})
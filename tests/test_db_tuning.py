@@ -0,0 +1,77 @@
+import pytest
+
+from infrastructure import db_tuning
+
+INSTANCE_CLASSES = ["db.t3.micro", "db.t3.medium", "db.t4g.large", "db.m6g.xlarge", "db.r6g.2xlarge", "db.r5.24xlarge"]
+
+
+@pytest.mark.parametrize("instance_class", INSTANCE_CLASSES)
+def test_memory_settings_fit_the_instance(instance_class):
+    memory_gib, vcpus = db_tuning.instance_resources(instance_class)
+    settings = db_tuning.postgres_settings(instance_class, "prod")
+    memory_kb = memory_gib * db_tuning.KB_PER_GIB
+
+    # shared_buffers and effective_cache_size are 8 kB pages
+    assert settings["shared_buffers"] * 8 == memory_kb // 4
+    assert settings["effective_cache_size"] * 8 == memory_kb * 3 // 4
+    assert settings["shared_buffers"] < settings["effective_cache_size"]
+    # work_mem and maintenance_work_mem are kB
+    assert 4096 <= settings["work_mem"] < memory_kb
+    assert settings["maintenance_work_mem"] <= 2 * db_tuning.KB_PER_GIB
+    assert 0 < settings["max_connections"] <= 5000
+    assert settings["max_worker_processes"] >= vcpus
+    assert settings["max_parallel_workers_per_gather"] <= settings["max_parallel_workers"]
+
+
+def test_small_instance_values():
+    settings = db_tuning.postgres_settings("db.t3.medium", "prod")
+
+    assert settings["max_connections"] == 450
+    assert settings["shared_buffers"] == 131072
+    assert settings["effective_cache_size"] == 393216
+    assert settings["work_mem"] == 4096
+    assert settings["maintenance_work_mem"] == 262144
+    assert settings["min_wal_size"] == 1024
+
+
+def test_large_instance_values_are_capped():
+    settings = db_tuning.postgres_settings("db.r6g.2xlarge", "prod")
+
+    assert settings["max_connections"] == 5000
+    assert settings["maintenance_work_mem"] == 2 * db_tuning.KB_PER_GIB
+    assert settings["max_wal_size"] == 16384
+    assert settings["max_parallel_workers"] == 8
+
+
+def test_unknown_instance_class_is_rejected():
+    with pytest.raises(ValueError, match="Unknown RDS instance class"):
+        db_tuning.postgres_settings("db.x9.large", "prod")
+
+
+@pytest.mark.parametrize("environment,expected", [
+    ("prod", {"log_statement": "ddl", "log_min_duration_statement": 500}),
+    ("staging", {"log_statement": "mod", "log_min_duration_statement": 200}),
+    ("dev", db_tuning.DEFAULT_LOGGING),
+])
+def test_logging_follows_the_environment(environment, expected):
+    settings = db_tuning.postgres_settings("db.t3.medium", environment)
+
+    assert {key: settings[key] for key in expected} == expected
+
+
+def test_static_parameters_wait_for_a_reboot():
+    parameters = db_tuning.parameter_group_parameters(db_tuning.postgres_settings("db.m6g.xlarge", "prod"))
+    methods = {parameter["name"]: parameter["apply_method"] for parameter in parameters}
+
+    for name in ("shared_buffers", "max_connections", "shared_preload_libraries", "max_worker_processes"):
+        assert methods[name] == "pending-reboot"
+    for name in ("work_mem", "effective_cache_size", "log_statement", "random_page_cost"):
+        assert methods[name] == "immediate"
+    assert all(isinstance(parameter["value"], str) for parameter in parameters)
+
+
+def test_aurora_settings_leave_out_managed_parameters():
+    settings = db_tuning.aurora_settings(0.5, 16, "prod")
+
+    assert not db_tuning.AURORA_MANAGED_PARAMETERS & set(settings)
+    assert settings["max_parallel_workers"] == 4
@@ -0,0 +1,122 @@
+import json
+import os
+import subprocess
+
+from infrastructure import index_lifecycle
+
+SNAPSHOTS = {
+    "repository": "s3-snapshots",
+    "bucket": "numeris-test-es-snapshots",
+    "base_path": "elasticsearch",
+    "schedule": "0 30 1 * * ?",
+    "retention": {"expire_after": "30d"},
+}
+
+
+def lifecycle(**overrides):
+    return {**index_lifecycle.DEFAULT_INDEX_LIFECYCLE, **overrides}
+
+
+def paths(requests):
+    return [path for path, _ in requests]
+
+
+def test_requests_without_snapshots():
+    requests = index_lifecycle.bootstrap_requests(lifecycle(), "numeris-beats", "numeris-beats")
+
+    assert paths(requests) == ["_ilm/policy/numeris-beats", "_index_template/numeris-beats"]
+
+
+def test_repository_is_registered_before_the_policies():
+    requests = index_lifecycle.bootstrap_requests(lifecycle(), "numeris-beats", "numeris-beats", SNAPSHOTS)
+
+    assert paths(requests) == [
+        "_snapshot/s3-snapshots",
+        "_slm/policy/s3-snapshots-scheduled",
+        "_ilm/policy/numeris-beats",
+        "_index_template/numeris-beats",
+    ]
+
+
+def test_cold_phase_needs_searchable_snapshots():
+    policy = dict(index_lifecycle.bootstrap_requests(lifecycle(cold_after="7d"), "p", "p", SNAPSHOTS))["_ilm/policy/p"]
+    assert "cold" not in policy["policy"]["phases"]
+
+    snapshots = {**SNAPSHOTS, "searchable_snapshots": True}
+    policy = dict(index_lifecycle.bootstrap_requests(lifecycle(cold_after="7d"), "p", "p", snapshots))["_ilm/policy/p"]
+    assert policy["policy"]["phases"]["cold"] == {
+        "min_age": "7d",
+        "actions": {"searchable_snapshot": {"snapshot_repository": "s3-snapshots"}},
+    }
+
+
+def test_index_template_attaches_the_policy():
+    template = index_lifecycle.index_template(lifecycle(shards=2), "numeris-beats")
+
+    assert template["index_patterns"] == ["logs-beats-*"]
+    assert template["template"]["settings"]["index.number_of_shards"] == 2
+    assert template["template"]["settings"]["index.lifecycle.name"] == "numeris-beats"
+
+
+def run_bootstrap(tmp_path, failing_path, health=0):
+    # Fake curl: records every PUT path and fails the one for `failing_path`;
+    # health checks count into `health` and exit with the given status
+    curl = tmp_path / "curl"
+    curl.write_text(
+        "#!/bin/sh\n"
+        f"for arg; do case $arg in *_cluster/health*) echo >> {tmp_path}/health; exit {health};; esac; done\n"
+        f"for arg; do case $arg in */{failing_path}) echo \"$arg\" >> {tmp_path}/calls; exit 22;; "
+        f"http*) echo \"$arg\" >> {tmp_path}/calls;; esac; done\n"
+    )
+    curl.chmod(0o755)
+    sleep = tmp_path / "sleep"
+    sleep.write_text("#!/bin/sh\n")
+    sleep.chmod(0o755)
+    (tmp_path / "calls").touch()
+    requests = index_lifecycle.bootstrap_requests(lifecycle(), "p", "p", SNAPSHOTS)
+    environment = {
+        entry["name"]: entry["value"]
+        for entry in index_lifecycle.bootstrap_environment("http://es:9200", requests)
+    }
+    result = subprocess.run(
+        ["sh", "-c", index_lifecycle.bootstrap_script(len(requests), health_attempts=3)],
+        env={**os.environ, **environment, "PATH": f"{tmp_path}:{os.environ['PATH']}"},
+        capture_output=True, text=True,
+    )
+    return result, (tmp_path / "calls").read_text().split()
+
+
+def test_bootstrap_applies_every_request(tmp_path):
+    result, calls = run_bootstrap(tmp_path, failing_path="none")
+
+    assert result.returncode == 0
+    assert calls == [
+        "http://es:9200/_snapshot/s3-snapshots",
+        "http://es:9200/_slm/policy/s3-snapshots-scheduled",
+        "http://es:9200/_ilm/policy/p",
+        "http://es:9200/_index_template/p",
+    ]
+
+
+def test_failed_request_does_not_skip_the_rest(tmp_path):
+    result, calls = run_bootstrap(tmp_path, failing_path="s3-snapshots-scheduled")
+
+    assert result.returncode == 1
+    assert "PUT _slm/policy/s3-snapshots-scheduled failed" in result.stderr
+    assert calls[-2:] == ["http://es:9200/_ilm/policy/p", "http://es:9200/_index_template/p"]
+
+
+def test_unhealthy_cluster_gives_up_without_failing(tmp_path):
+    result, calls = run_bootstrap(tmp_path, failing_path="none", health=7)
+
+    assert result.returncode == 0
+    assert "not healthy, skipping bootstrap" in result.stderr
+    assert len((tmp_path / "health").read_text().splitlines()) == 3
+    assert calls == []
+
+
+def test_bodies_are_json():
+    requests = index_lifecycle.bootstrap_requests(lifecycle(), "p", "p", SNAPSHOTS)
+    for entry in index_lifecycle.bootstrap_environment("http://es:9200", requests):
+        if entry["name"].endswith("_BODY"):
+            json.loads(entry["value"])
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("pulumi_aws")
+
+from infrastructure import invokes
+
+
+class StubInvoke:
+    """Stands in for a provider invoke and counts the real calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        return {"result": self.calls, **kwargs}
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    invokes.invalidate()
+    invokes.set_enabled(True)
+    yield
+    invokes.invalidate()
+    invokes.set_enabled(True)
+
+
+def test_repeated_call_is_a_cache_hit():
+    stub = StubInvoke()
+    first = invokes.cached_invoke(stub, state="available")
+    second = invokes.cached_invoke(stub, state="available")
+
+    assert first is second
+    assert stub.calls == 1
+    assert invokes.cache_stats() == {"hits": 1, "misses": 1}
+
+
+def test_different_arguments_are_separate_entries():
+    stub = StubInvoke()
+    invokes.cached_invoke(stub, state="available")
+    invokes.cached_invoke(stub, state="unavailable")
+
+    assert stub.calls == 2
+    assert invokes.cache_stats() == {"hits": 0, "misses": 2}
+
+
+def test_invalidate_clears_results_and_counters():
+    stub = StubInvoke()
+    invokes.cached_invoke(stub)
+    invokes.cached_invoke(stub)
+    invokes.invalidate()
+
+    assert invokes.cache_stats() == {"hits": 0, "misses": 0}
+    invokes.cached_invoke(stub)
+    assert stub.calls == 2
+    assert invokes.cache_stats() == {"hits": 0, "misses": 1}
+
+
+def test_bypass_always_calls_through():
+    stub = StubInvoke()
+    invokes.cached_invoke(stub)
+    invokes.cached_invoke(stub, bypass=True)
+
+    assert stub.calls == 2
+    assert invokes.cache_stats() == {"hits": 0, "misses": 2}
+
+
+def test_disabled_cache_calls_through_and_does_not_store():
+    stub = StubInvoke()
+    invokes.set_enabled(False)
+    invokes.cached_invoke(stub)
+    invokes.cached_invoke(stub)
+    invokes.set_enabled(True)
+    invokes.cached_invoke(stub)
+
+    assert stub.calls == 3
+    assert invokes.cache_stats() == {"hits": 0, "misses": 3}
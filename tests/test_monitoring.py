@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+
+from infrastructure.compute import ComputeStack
+from infrastructure.monitoring import DEFAULT_ELASTICSEARCH_STORAGE, LOGSTASH_IMAGE, MonitoringStack
+from infrastructure.networking import NetworkStack
+from infrastructure.security import SecurityStack
+
+
+def deploy(mocks, config):
+    """Build the stacks MonitoringStack depends on and wait for every registration."""
+    mocks.set_config(config)
+    stacks = {}
+
+    @pulumi.runtime.test
+    def run():
+        tags = {"Project": "numeris"}
+        network = NetworkStack(project_name="numeris", environment="test", common_tags=tags)
+        security = SecurityStack(network=network, project_name="numeris", environment="test", common_tags=tags, domain="example.com")
+        compute = ComputeStack(network=network, security=security, data=None, project_name="numeris", environment="test", common_tags=tags)
+        stacks["monitoring"] = MonitoringStack(network=network, security=security, compute=compute,
+                                               project_name="numeris", environment="test", common_tags=tags)
+
+    run()
+    return stacks["monitoring"]
+
+
+def named(mocks, typ, suffix):
+    return [resource for resource in mocks.of_type(typ) if resource.name.endswith(suffix)]
+
+
+def logstash_containers(mocks):
+    task, = named(mocks, "aws:ecs/taskDefinition:TaskDefinition", "-logstash-task")
+    return {container["name"]: container for container in json.loads(task.inputs["containerDefinitions"])}
+
+
+def logstash_container(mocks):
+    return logstash_containers(mocks)["logstash"]
+
+
+def logstash_pipeline(mocks):
+    environment = {entry["name"]: entry["value"] for entry in logstash_container(mocks)["environment"]}
+    return environment["LOGSTASH_CONFIG_STRING"]
+
+
+def test_ingest_buffer_enabled(pulumi_mocks):
+    deploy(pulumi_mocks, {"monitoring:ingest_buffer": {"enabled": True}})
+
+    assert len(pulumi_mocks.of_type("aws:kinesis/stream:Stream")) == 1
+    assert named(pulumi_mocks, "aws:iam/rolePolicy:RolePolicy", "-ingest-stream-policy")
+    assert "kinesis {" in logstash_pipeline(pulumi_mocks)
+    assert "beats {" in logstash_pipeline(pulumi_mocks)
+    assert named(pulumi_mocks, "aws:appautoscaling/policy:Policy", "logstash-app-kinesis-backlog-scaling")
+    assert named(pulumi_mocks, "aws:cloudwatch/metricAlarm:MetricAlarm", "-logstash-kinesis-backlog-alarm")
+    scale_in_alarm, = named(pulumi_mocks, "aws:cloudwatch/metricAlarm:MetricAlarm", "-logstash-kinesis-backlog-scale-in-alarm")
+    assert scale_in_alarm.inputs["comparisonOperator"] == "LessThanThreshold"
+    assert named(pulumi_mocks, "aws:appautoscaling/policy:Policy", "logstash-app-kinesis-backlog-scale-in")
+    # The plugin is baked into an image in ECR instead of installed at start-up
+    assert len(pulumi_mocks.of_type("docker:index/image:Image")) == 1
+    assert logstash_container(pulumi_mocks)["image"].endswith("@sha256:0123")
+    assert "logstash-plugin" not in json.dumps(logstash_container(pulumi_mocks))
+
+
+def test_ingest_buffer_disabled(pulumi_mocks):
+    deploy(pulumi_mocks, {"monitoring:ingest_buffer": {"enabled": False}})
+
+    assert not pulumi_mocks.of_type("aws:kinesis/stream:Stream")
+    assert not named(pulumi_mocks, "aws:iam/rolePolicy:RolePolicy", "-ingest-stream-policy")
+    assert "kinesis" not in logstash_pipeline(pulumi_mocks)
+    assert not named(pulumi_mocks, "aws:appautoscaling/policy:Policy", "logstash-app-kinesis-backlog-scaling")
+    assert not pulumi_mocks.of_type("docker:index/image:Image")
+    assert logstash_container(pulumi_mocks)["image"] == LOGSTASH_IMAGE
+
+
+def test_prebuilt_logstash_image_skips_the_build(pulumi_mocks):
+    deploy(pulumi_mocks, {
+        "monitoring:ingest_buffer": {"enabled": True},
+        "monitoring:logstash_image": "registry.example.com/logstash-kinesis:8.10.0",
+    })
+
+    assert not pulumi_mocks.of_type("docker:index/image:Image")
+    assert logstash_container(pulumi_mocks)["image"] == "registry.example.com/logstash-kinesis:8.10.0"
+
+
+def test_logstash_waits_for_the_index_bootstrap(pulumi_mocks):
+    deploy(pulumi_mocks, {})
+    containers = logstash_containers(pulumi_mocks)
+
+    bootstrap = containers["index-bootstrap"]
+    assert bootstrap["essential"] is False
+    assert "_index_template/" in json.dumps(bootstrap["environment"])
+    assert containers["logstash"]["dependsOn"] == [{"containerName": "index-bootstrap", "condition": "COMPLETE"}]
+
+
+def elasticsearch_environments(mocks):
+    environments = {}
+    for task in mocks.of_type("aws:ecs/taskDefinition:TaskDefinition"):
+        for container in json.loads(task.inputs["containerDefinitions"]):
+            if container["name"] == "elasticsearch":
+                environment = {entry["name"]: entry["value"] for entry in container["environment"]}
+                environments[environment["node.roles"]] = environment
+    return environments
+
+
+def test_elasticsearch_nodes_do_not_need_mmap(pulumi_mocks):
+    deploy(pulumi_mocks, {})
+    environments = elasticsearch_environments(pulumi_mocks)
+
+    assert set(environments) == {"master", "data,ingest"}
+    for environment in environments.values():
+        assert environment["node.store.allow_mmap"] == "false"
+
+
+def storage(**overrides):
+    return {**DEFAULT_ELASTICSEARCH_STORAGE, **overrides}
+
+
+def validate(settings):
+    return MonitoringStack.__new__(MonitoringStack).storage_settings(settings)
+
+
+def test_default_storage_is_valid():
+    assert validate(storage()) == storage()
+
+
+def test_provisioned_throughput_is_accepted():
+    settings = storage(throughput_mode="provisioned", provisioned_throughput_mibps=128)
+
+    assert validate(settings)["provisioned_throughput_mibps"] == 128
+
+
+@pytest.mark.parametrize("throughput", [None, 0, -5])
+def test_provisioned_mode_needs_a_positive_throughput(throughput):
+    with pytest.raises(ValueError, match="provisioned_throughput_mibps"):
+        validate(storage(throughput_mode="provisioned", provisioned_throughput_mibps=throughput))
+
+
+@pytest.mark.parametrize("overrides", [{"type": "ebs"}, {"throughput_mode": "max"}, {"ephemeral_storage_gib": 10}])
+def test_invalid_storage_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        validate(storage(**overrides))
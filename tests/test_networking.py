@@ -0,0 +1,80 @@
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+
+from infrastructure.networking import NetworkStack, VPC_ENDPOINT_CATALOG
+
+VPC_ENDPOINT = "aws:ec2/vpcEndpoint:VpcEndpoint"
+
+
+def specs_for(config):
+    stack = NetworkStack.__new__(NetworkStack)
+    stack.vpc_endpoint_config = config
+    return {spec["service"]: spec for spec in stack.endpoint_specs()}
+
+
+def test_catalog_names_take_catalog_defaults():
+    specs = specs_for(["s3", "ecr.api"])
+
+    assert specs["s3"] == {"service": "s3", "type": "Gateway", "route_tables": ["private"], "private_dns": True}
+    assert specs["ecr.api"]["type"] == "Interface"
+
+
+def test_object_entries_override_catalog_defaults():
+    specs = specs_for([{"service": "s3", "route_tables": ["private", "public"]}, {"service": "logs", "private_dns": False}])
+
+    assert specs["s3"]["route_tables"] == ["private", "public"]
+    assert specs["logs"]["private_dns"] is False
+
+
+def test_unknown_service_needs_an_explicit_type():
+    with pytest.raises(Exception, match="Unknown VPC endpoint service"):
+        specs_for(["execute-api"])
+
+    assert specs_for([{"service": "execute-api", "type": "Interface"}])["execute-api"]["type"] == "Interface"
+
+
+def build_network(mocks, config):
+    mocks.set_config(config)
+    return NetworkStack(project_name="numeris", environment="test", common_tags={"Project": "numeris"})
+
+
+def endpoints_by_service(mocks):
+    # Service names look like com.amazonaws.us-east-1.ecr.api
+    return {
+        resource.inputs["serviceName"].split("us-east-1.", 1)[1]: resource.inputs
+        for resource in mocks.of_type(VPC_ENDPOINT)
+    }
+
+
+@pulumi.runtime.test
+def test_default_config_creates_every_catalog_endpoint(pulumi_mocks):
+    network = build_network(pulumi_mocks, {})
+
+    def check(_):
+        endpoints = endpoints_by_service(pulumi_mocks)
+        assert set(endpoints) == set(VPC_ENDPOINT_CATALOG)
+        assert endpoints["s3"]["vpcEndpointType"] == "Gateway"
+        assert len(endpoints["s3"]["routeTableIds"]) == 1
+        assert endpoints["ecr.dkr"]["vpcEndpointType"] == "Interface"
+        assert endpoints["ecr.dkr"]["privateDnsEnabled"] is True
+
+    return pulumi.Output.all(*[endpoint.id for endpoint in network.vpc_endpoints.values()]).apply(check)
+
+
+@pulumi.runtime.test
+def test_configured_endpoints_only(pulumi_mocks):
+    network = build_network(pulumi_mocks, {
+        "network:nat_mode": "per-az",
+        "network:vpc_endpoints": ["s3", {"service": "logs", "private_dns": False}],
+    })
+
+    def check(_):
+        endpoints = endpoints_by_service(pulumi_mocks)
+        assert set(endpoints) == {"s3", "logs"}
+        # One private route table per AZ in per-az NAT mode
+        assert len(endpoints["s3"]["routeTableIds"]) == 2
+        assert endpoints["logs"]["privateDnsEnabled"] is False
+        assert len(endpoints["logs"]["subnetIds"]) == 2
+
+    return pulumi.Output.all(*[endpoint.id for endpoint in network.vpc_endpoints.values()]).apply(check)
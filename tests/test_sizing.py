@@ -0,0 +1,70 @@
+import pytest
+
+from infrastructure import sizing
+
+# Every CPU/memory combination Fargate accepts, from the AWS task size table
+VALID_SIZES = [
+    (256, 512), (256, 1024), (256, 2048),
+    (512, 1024), (512, 2048), (512, 3072), (512, 4096),
+    *[(1024, memory) for memory in range(2048, 8193, 1024)],
+    *[(2048, memory) for memory in range(4096, 16385, 1024)],
+    *[(4096, memory) for memory in range(8192, 30721, 1024)],
+    *[(8192, memory) for memory in range(16384, 61441, 4096)],
+    *[(16384, memory) for memory in range(32768, 122881, 8192)],
+]
+
+INVALID_SIZES = [
+    (256, 1536),
+    (256, 4096),
+    (512, 512),
+    (512, 1536),
+    (1024, 1024),
+    (1024, 9216),
+    (4096, 31744),
+    (8192, 18432),
+    (16384, 36864),
+    (128, 512),
+    (3072, 8192),
+]
+
+
+@pytest.mark.parametrize("cpu,memory", VALID_SIZES)
+def test_valid_sizes_are_accepted(cpu, memory):
+    sizing.validate_fargate_size(cpu, memory)
+
+
+@pytest.mark.parametrize("cpu,memory", INVALID_SIZES)
+def test_invalid_sizes_are_rejected(cpu, memory):
+    with pytest.raises(ValueError):
+        sizing.validate_fargate_size(cpu, memory)
+
+
+def test_size_table_matches_fargate():
+    assert {(cpu, memory) for cpu, allowed in sizing.FARGATE_SIZES.items() for memory in allowed} == set(VALID_SIZES)
+
+
+def test_elasticsearch_heap_is_half_the_task_memory():
+    assert sizing.elasticsearch_sizing(1024, 4096)["heap_mb"] == 2048
+
+
+def test_elasticsearch_heap_stays_under_compressed_oops_limit():
+    assert sizing.elasticsearch_sizing(16384, 122880)["heap_mb"] == sizing.COMPRESSED_OOPS_HEAP_MB
+
+
+def test_logstash_gets_one_worker_per_vcpu():
+    assert sizing.logstash_sizing(256, 512)["pipeline_workers"] == 1
+    assert sizing.logstash_sizing(4096, 8192)["pipeline_workers"] == 4
+
+
+def test_logstash_and_kibana_heaps_are_capped():
+    assert sizing.logstash_sizing(8192, 61440)["heap_mb"] == sizing.LOGSTASH_MAX_HEAP_MB
+    assert sizing.kibana_sizing(4096, 16384)["heap_mb"] == sizing.KIBANA_MAX_HEAP_MB
+
+
+def test_sizing_helpers_validate_the_size():
+    with pytest.raises(ValueError, match="not valid"):
+        sizing.logstash_sizing(256, 1536)
+
+
+def test_java_opts_pins_min_and_max_heap():
+    assert sizing.java_opts(1024) == "-Xms1024m -Xmx1024m"